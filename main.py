@@ -9,31 +9,59 @@ import sys
 import asyncio
 from pathlib import Path
 
-from src.ingestion.document_processor import DocumentProcessor
-from src.storage.vector_store import VectorStore
-from src.retrieval.retriever import CampaignRetriever, RetrievalContext
-from src.llm.service_factory import LLMServiceFactory
-from src.synthesis.content_synthesizer import ContentSynthesizer, SynthesisRequest
-from src.config.settings import get_settings
+# Heavy imports (chromadb, sentence-transformers, ollama, ...) are deferred
+# into setup_system()/command branches so cheap commands start fast.
 
+# Commands that need the LLM stack initialized
+LLM_COMMANDS = {'ask', 'synthesize', 'summary', 'models'}
 
-def setup_system():
+# Shared event loop so successive LLM calls keep warm HTTP connections
+_event_loop = None
+
+
+def run_async(coro):
+    """Run a coroutine on one process-wide event loop.
+
+    asyncio.run would create and tear down a fresh loop (and executor)
+    per call, dropping the ollama client's keepalive connections.
+    """
+    global _event_loop
+    if _event_loop is None:
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+        _event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_event_loop)
+    return _event_loop.run_until_complete(coro)
+
+
+def setup_system(need_llm: bool = True):
     """Initialize the campaign assistant system."""
+    from src.config.settings import get_settings
+    from src.ingestion.document_processor import DocumentProcessor
+    from src.storage.vector_store import VectorStore
+    from src.retrieval.retriever import CampaignRetriever
+
     print("🎲 Initializing Campaign Assistant...")
-    
+
     # Load settings
     settings = get_settings()
-    
+
     # Initialize components
     processor = DocumentProcessor()
     vector_store = VectorStore()
     retriever = CampaignRetriever(vector_store)
-    
+
     # Initialize LLM service if enabled
     llm_service = None
     synthesizer = None
-    
-    if settings.features.beta.get("llm_integration", False):
+
+    if need_llm and settings.features.beta.llm_integration:
+        from src.llm.service_factory import LLMServiceFactory
+        from src.synthesis.content_synthesizer import ContentSynthesizer
+
         print("🤖 Initializing LLM integration...")
         llm_service = LLMServiceFactory.create_service(settings)
         
@@ -74,13 +102,14 @@ def ingest_documents(processor, vector_store, path):
             return
         
         print(f"📄 Found {len(documents)} documents")
-        
-        for doc in documents:
-            try:
-                vector_store.add_document(doc)
+
+        try:
+            # Single batched insert: one embedding pass + one Chroma write
+            vector_store.add_documents(documents)
+            for doc in documents:
                 print(f"✅ Added: {doc.title}")
-            except Exception as e:
-                print(f"❌ Error adding {doc.title}: {e}")
+        except Exception as e:
+            print(f"❌ Error adding documents: {e}")
     
     # Show collection stats
     stats = vector_store.get_collection_stats()
@@ -113,16 +142,23 @@ def interactive_search(retriever):
                 print("❌ No relevant content found")
                 continue
             
-            print(f"\n📋 Found {len(results)} relevant results:\n")
-            
+            # Build the whole result batch and write it once
+            lines = [f"\n📋 Found {len(results)} relevant results:\n"]
+
             for i, result in enumerate(results, 1):
-                print(f"🎯 Result {i} (Score: {result.relevance_score:.3f})")
-                print(f"📄 Source: {result.source_title}")
-                print(f"🏷️  Type: {result.content_type}")
-                print(f"📝 Content: {result.content[:300]}...")
-                if len(result.content) > 300:
-                    print("    [truncated]")
-                print("-" * 40)
+                content = result.content
+                snippet = content[:300]
+                truncated = len(content) > 300
+                lines.append(f"🎯 Result {i} (Score: {result.relevance_score:.3f})")
+                lines.append(f"📄 Source: {result.source_title}")
+                lines.append(f"🏷️  Type: {result.content_type}")
+                lines.append(f"📝 Content: {snippet}...")
+                if truncated:
+                    lines.append("    [truncated]")
+                lines.append("-" * 40)
+
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
         
         except KeyboardInterrupt:
             break
@@ -152,61 +188,107 @@ def list_documents(vector_store):
         print()
 
 
-def main():
-    """Main entry point."""
-    parser = argparse.ArgumentParser(
-        description="Campaign Assistant - D&D Campaign Management Tool"
-    )
-    
-    subparsers = parser.add_subparsers(dest='command', help='Available commands')
-    
-    # Ingest command
+def _add_ingest_parser(subparsers):
     ingest_parser = subparsers.add_parser('ingest', help='Ingest documents')
     ingest_parser.add_argument('path', help='Path to file or directory to ingest')
-    
-    # Search command
+
+
+def _add_search_parser(subparsers):
     search_parser = subparsers.add_parser('search', help='Search documents')
     search_parser.add_argument('query', help='Search query')
-    search_parser.add_argument('--max-results', type=int, default=5, 
+    search_parser.add_argument('--max-results', type=int, default=5,
                               help='Maximum number of results')
-    
-    # Interactive command
+
+
+def _add_interactive_parser(subparsers):
     subparsers.add_parser('interactive', help='Start interactive search mode')
-    
-    # List command
+
+
+def _add_list_parser(subparsers):
     subparsers.add_parser('list', help='List all documents')
-    
-    # Stats command
+
+
+def _add_stats_parser(subparsers):
     subparsers.add_parser('stats', help='Show collection statistics')
-    
-    # Reset command
+
+
+def _add_reset_parser(subparsers):
     subparsers.add_parser('reset', help='Reset the document collection')
-    
-    # Ask command (LLM-powered)
+
+
+def _add_ask_parser(subparsers):
     ask_parser = subparsers.add_parser('ask', help='Ask AI about campaign content')
-    ask_parser.add_argument('question', help='Question to ask')
-    ask_parser.add_argument('--intent', choices=['general', 'session_prep', 'npc_info', 
-                                                'lore_expansion', 'encounter_design'], 
+    # Bare words are joined into one question, so an unquoted
+    # `ask what is the plan` stays a single query; extra questions
+    # batch in via repeated --also
+    ask_parser.add_argument('question', nargs='+', help='Question to ask (bare words are joined)')
+    ask_parser.add_argument('--also', action='append', default=[], metavar='QUESTION',
+                           help='Additional question to answer in the same batch (repeatable)')
+    ask_parser.add_argument('--intent', choices=['general', 'session_prep', 'npc_info',
+                                                'lore_expansion', 'encounter_design'],
                            default='general', help='Type of question/intent')
     ask_parser.add_argument('--tone', choices=['dark', 'whimsical', 'epic', 'mysterious', 'gritty'],
                            help='Desired tone for response')
-    
-    # Synthesize command (Advanced LLM features)
+
+
+def _add_synthesize_parser(subparsers):
     synthesize_parser = subparsers.add_parser('synthesize', help='Generate campaign content')
     synthesize_parser.add_argument('prompt', help='Content generation prompt')
-    synthesize_parser.add_argument('--intent', choices=['session_prep', 'npc_info', 
-                                                       'lore_expansion', 'encounter_design'], 
+    synthesize_parser.add_argument('--intent', choices=['session_prep', 'npc_info',
+                                                       'lore_expansion', 'encounter_design'],
                                   default='session_prep', help='Type of content to generate')
     synthesize_parser.add_argument('--tone', choices=['dark', 'whimsical', 'epic', 'mysterious', 'gritty'],
                                   help='Desired tone for content')
-    
-    # Summary command
+
+
+def _add_summary_parser(subparsers):
     summary_parser = subparsers.add_parser('summary', help='Generate session summary')
     summary_parser.add_argument('notes', help='Session notes or path to notes file')
-    
-    # Models command (show model status)
+
+
+def _add_models_parser(subparsers):
     subparsers.add_parser('models', help='Show available models and task assignments')
-    
+
+
+# Subcommand builders, keyed by command name
+COMMAND_BUILDERS = {
+    'ingest': _add_ingest_parser,
+    'search': _add_search_parser,
+    'interactive': _add_interactive_parser,
+    'list': _add_list_parser,
+    'stats': _add_stats_parser,
+    'reset': _add_reset_parser,
+    'ask': _add_ask_parser,
+    'synthesize': _add_synthesize_parser,
+    'summary': _add_summary_parser,
+    'models': _add_models_parser,
+}
+
+
+def build_parser(only: str = None) -> argparse.ArgumentParser:
+    """Build the CLI parser, optionally with just one subcommand."""
+    parser = argparse.ArgumentParser(
+        description="Campaign Assistant - D&D Campaign Management Tool"
+    )
+
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+
+    for name, add_subparser in COMMAND_BUILDERS.items():
+        if only is None or name == only:
+            add_subparser(subparsers)
+
+    return parser
+
+
+def main():
+    """Main entry point."""
+    # Each invocation uses exactly one subcommand, so only build that
+    # subparser; --help and unknown commands get the full parser
+    if len(sys.argv) >= 2 and sys.argv[1] in COMMAND_BUILDERS:
+        parser = build_parser(only=sys.argv[1])
+    else:
+        parser = build_parser()
+
     args = parser.parse_args()
     
     if not args.command:
@@ -215,7 +297,9 @@ def main():
     
     # Initialize system
     try:
-        processor, vector_store, retriever, synthesizer, settings = setup_system()
+        processor, vector_store, retriever, synthesizer, settings = setup_system(
+            need_llm=args.command in LLM_COMMANDS
+        )
     except Exception as e:
         print(f"❌ Failed to initialize system: {e}")
         sys.exit(1)
@@ -231,13 +315,15 @@ def main():
             if not results:
                 print("❌ No relevant content found")
             else:
-                print(f"\n🎯 Search Results for: '{args.query}'\n")
+                lines = [f"\n🎯 Search Results for: '{args.query}'\n"]
                 for i, result in enumerate(results, 1):
-                    print(f"Result {i} (Score: {result.relevance_score:.3f})")
-                    print(f"Source: {result.source_title}")
-                    print(f"Type: {result.content_type}")
-                    print(f"Content: {result.content[:200]}...")
-                    print("-" * 40)
+                    lines.append(f"Result {i} (Score: {result.relevance_score:.3f})")
+                    lines.append(f"Source: {result.source_title}")
+                    lines.append(f"Type: {result.content_type}")
+                    lines.append(f"Content: {result.content[:200]}...")
+                    lines.append("-" * 40)
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
         
         elif args.command == 'interactive':
             interactive_search(retriever)
@@ -266,37 +352,52 @@ def main():
                 print("❌ LLM integration not available. Check Ollama installation.")
                 sys.exit(1)
             
-            print(f"🤖 Asking AI: {args.question}")
-            request = SynthesisRequest(
-                query=args.question,
-                intent=args.intent,
-                tone=args.tone,
-                max_context_docs=5
-            )
-            
-            result = asyncio.run(synthesizer.synthesize(request))
-            
-            model_used = result.llm_response.metadata.get("actual_model", "unknown") if result.llm_response.metadata else "unknown"
-            print(f"\n🎯 AI Response (🤖 {model_used}, Confidence: {result.confidence:.2f}):")
-            print("-" * 50)
-            print(result.content)
-            print("-" * 50)
-            print(f"📚 Sources: {', '.join(result.sources) if result.sources else 'None'}")
+            from src.synthesis.content_synthesizer import SynthesisRequest
+
+            questions = [' '.join(args.question)] + args.also
+
+            intent = sys.intern(args.intent)
+            tone = sys.intern(args.tone) if args.tone else None
+            requests = [
+                SynthesisRequest(
+                    query=question,
+                    intent=intent,
+                    tone=tone,
+                    max_context_docs=5
+                )
+                for question in questions
+            ]
+
+            for question in questions:
+                print(f"🤖 Asking AI: {question}")
+
+            # Run all questions concurrently so LLM calls overlap
+            results = run_async(synthesizer.synthesize_batch(requests))
+
+            for question, result in zip(questions, results):
+                model_used = result.llm_response.metadata.get("actual_model", "unknown") if result.llm_response.metadata else "unknown"
+                print(f"\n🎯 AI Response to '{question}' (🤖 {model_used}, Confidence: {result.confidence:.2f}):")
+                print("-" * 50)
+                print(result.content)
+                print("-" * 50)
+                print(f"📚 Sources: {', '.join(result.sources) if result.sources else 'None'}")
         
         elif args.command == 'synthesize':
             if not synthesizer:
                 print("❌ LLM integration not available. Check Ollama installation.")
                 sys.exit(1)
             
+            from src.synthesis.content_synthesizer import SynthesisRequest
+
             print(f"🧠 Synthesizing content: {args.prompt}")
             request = SynthesisRequest(
                 query=args.prompt,
-                intent=args.intent,
-                tone=args.tone,
+                intent=sys.intern(args.intent),
+                tone=sys.intern(args.tone) if args.tone else None,
                 max_context_docs=5
             )
             
-            result = asyncio.run(synthesizer.synthesize(request))
+            result = run_async(synthesizer.synthesize(request))
             
             model_used = result.llm_response.metadata.get("actual_model", "unknown") if result.llm_response.metadata else "unknown"
             print(f"\n📜 Generated Content (🤖 {model_used}, Confidence: {result.confidence:.2f}):")
@@ -319,7 +420,7 @@ def main():
                 session_notes = args.notes
             
             print("📝 Generating session summary...")
-            result = asyncio.run(synthesizer.generate_session_summary(session_notes))
+            result = run_async(synthesizer.generate_session_summary(session_notes))
             
             model_used = result.llm_response.metadata.get("actual_model", "unknown") if result.llm_response.metadata else "unknown"
             print(f"\n📋 Session Summary (🤖 {model_used}, Confidence: {result.confidence:.2f}):")
@@ -3,7 +3,11 @@ Configuration management for Campaign Assistant.
 Implements 12-factor app principles with environment-aware YAML configuration.
 """
 
+import functools
+import hashlib
+import json
 import os
+import re
 import logging
 import logging.config
 from pathlib import Path
@@ -11,10 +15,29 @@ from typing import Dict, Any, Optional, Union
 from dataclasses import dataclass, field
 
 import yaml
-from pydantic import BaseModel, Field, validator
+try:
+    # libyaml C bindings are substantially faster than the pure-Python parser
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+try:
+    # orjson parses/serializes the cached config far faster than stdlib json
+    import orjson
+except ImportError:
+    orjson = None
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class AppConfig(BaseModel):
+# Matches ${VAR} and ${VAR:default} placeholders in config values
+_ENV_VAR_PATTERN = re.compile(r'^\$\{([^:}]+)(?::([^}]*))?\}$')
+
+
+class FrozenModel(BaseModel):
+    """Base for config models: immutable, validated once at construction."""
+    model_config = ConfigDict(frozen=True)
+
+
+class AppConfig(FrozenModel):
     """Application configuration."""
     name: str = "Campaign Assistant"
     version: str = "0.1.0"
@@ -22,14 +45,22 @@ class AppConfig(BaseModel):
     log_level: str = "INFO"
 
 
-class VectorDBConfig(BaseModel):
+class VectorDBConfig(FrozenModel):
     """Vector database configuration."""
     provider: str = "chromadb"
     path: str = "./data/chroma_db"
     collection_name: str = "campaign_documents"
+    # Chunks inserted per collection.add call during batched ingestion
+    insert_batch_size: int = 512
+    # HNSW tuning: graph degree, build-time and query-time beam widths.
+    # Lower search_ef trades recall for QPS; raise it for slow-path
+    # queries that need better recall
+    hnsw_m: int = 16
+    hnsw_construction_ef: int = 200
+    hnsw_search_ef: int = 64
 
 
-class FileStorageConfig(BaseModel):
+class FileStorageConfig(FrozenModel):
     """File storage configuration."""
     data_dir: str = "./data"
     upload_dir: str = "./data/uploads"
@@ -37,39 +68,44 @@ class FileStorageConfig(BaseModel):
     max_file_size_mb: int = 50
 
 
-class StorageConfig(BaseModel):
+class StorageConfig(FrozenModel):
     """Storage configuration."""
     vector_db: VectorDBConfig = Field(default_factory=VectorDBConfig)
     files: FileStorageConfig = Field(default_factory=FileStorageConfig)
 
 
-class ChunkingConfig(BaseModel):
+class ChunkingConfig(FrozenModel):
     """Document chunking configuration."""
     chunk_size: int = 1000
     chunk_overlap: int = 200
 
 
-class ProcessingConfig(BaseModel):
+class ProcessingConfig(FrozenModel):
     """Document processing configuration."""
     chunking: ChunkingConfig = Field(default_factory=ChunkingConfig)
     supported_formats: list[str] = [".pdf", ".md", ".markdown", ".txt"]
     classification: dict[str, Any] = {"enabled": True, "confidence_threshold": 0.7}
 
 
-class EmbeddingModelConfig(BaseModel):
+class EmbeddingModelConfig(FrozenModel):
     """Embedding model configuration."""
     provider: str = "sentence_transformers"
     name: str = "all-MiniLM-L6-v2"
     cache_dir: str = "./data/models"
+    # Inference backend: "default" (fp32), "fp16" (GPU half precision),
+    # "bf16" (bfloat16 on hardware with native support) or "int8"
+    # (dynamic quantization of the linear layers on CPU)
+    backend: str = "default"
 
 
-class EmbeddingsConfig(BaseModel):
+class EmbeddingsConfig(FrozenModel):
     """Embeddings configuration."""
     model: EmbeddingModelConfig = Field(default_factory=EmbeddingModelConfig)
     alternatives: list[dict[str, str]] = []
+    quantization: Optional[str] = None  # None (fp32) or "int8"
 
 
-class SearchConfig(BaseModel):
+class SearchConfig(FrozenModel):
     """Search configuration."""
     default_max_results: int = 5
     similarity_threshold: float = 0.3
@@ -77,20 +113,20 @@ class SearchConfig(BaseModel):
     enable_context_boosting: bool = True
 
 
-class QueryConfig(BaseModel):
+class QueryConfig(FrozenModel):
     """Query processing configuration."""
     max_query_length: int = 1000
     enable_query_expansion: bool = False
     enable_spell_correction: bool = False
 
 
-class RetrievalConfig(BaseModel):
+class RetrievalConfig(FrozenModel):
     """Retrieval configuration."""
     search: SearchConfig = Field(default_factory=SearchConfig)
     query: QueryConfig = Field(default_factory=QueryConfig)
 
 
-class LocalLLMConfig(BaseModel):
+class LocalLLMConfig(FrozenModel):
     """Local LLM configuration."""
     enabled: bool = True
     provider: str = "ollama"
@@ -118,7 +154,7 @@ class LocalLLMConfig(BaseModel):
     ])
 
 
-class OpenAIConfig(BaseModel):
+class OpenAIConfig(FrozenModel):
     """OpenAI configuration."""
     enabled: bool = False
     model: str = "gpt-4o-mini"
@@ -126,7 +162,7 @@ class OpenAIConfig(BaseModel):
     temperature: float = 0.7
 
 
-class AnthropicConfig(BaseModel):
+class AnthropicConfig(FrozenModel):
     """Anthropic configuration."""
     enabled: bool = False
     model: str = "claude-3-haiku-20240307"
@@ -134,19 +170,19 @@ class AnthropicConfig(BaseModel):
     temperature: float = 0.7
 
 
-class CloudLLMConfig(BaseModel):
+class CloudLLMConfig(FrozenModel):
     """Cloud LLM configuration."""
     openai: OpenAIConfig = Field(default_factory=OpenAIConfig)
     anthropic: AnthropicConfig = Field(default_factory=AnthropicConfig)
 
 
-class LLMConfig(BaseModel):
+class LLMConfig(FrozenModel):
     """LLM configuration."""
     local: LocalLLMConfig = Field(default_factory=LocalLLMConfig)
     cloud: CloudLLMConfig = Field(default_factory=CloudLLMConfig)
 
 
-class APIConfig(BaseModel):
+class APIConfig(FrozenModel):
     """API server configuration."""
     host: str = "0.0.0.0"
     port: int = 8000
@@ -154,39 +190,50 @@ class APIConfig(BaseModel):
     reload: bool = False
 
 
-class CORSConfig(BaseModel):
+class CORSConfig(FrozenModel):
     """CORS configuration."""
     enabled: bool = True
     origins: list[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
 
-class APIKeysConfig(BaseModel):
+class APIKeysConfig(FrozenModel):
     """API keys configuration."""
     openai: Optional[str] = None
     anthropic: Optional[str] = None
 
 
-class SecurityConfig(BaseModel):
+class SecurityConfig(FrozenModel):
     """Security configuration."""
     api_keys: APIKeysConfig = Field(default_factory=APIKeysConfig)
     cors: CORSConfig = Field(default_factory=CORSConfig)
 
 
-class FeatureFlagsConfig(BaseModel):
+class ExperimentalFlagsConfig(FrozenModel):
+    """Experimental feature flags."""
+    enabled: bool = False
+
+
+class BetaFlagsConfig(FrozenModel):
+    """Beta feature flags."""
+    multi_campaign_support: bool = False
+    web_interface: bool = False
+    llm_integration: bool = True
+
+
+class AlphaFlagsConfig(FrozenModel):
+    """Alpha feature flags."""
+    advanced_analytics: bool = False
+    collaborative_features: bool = False
+
+
+class FeatureFlagsConfig(FrozenModel):
     """Feature flags configuration."""
-    experimental: dict[str, bool] = {"enabled": False}
-    beta: dict[str, bool] = {
-        "multi_campaign_support": False,
-        "web_interface": False,
-        "llm_integration": True
-    }
-    alpha: dict[str, bool] = {
-        "advanced_analytics": False,
-        "collaborative_features": False
-    }
-
-
-class Settings(BaseModel):
+    experimental: ExperimentalFlagsConfig = Field(default_factory=ExperimentalFlagsConfig)
+    beta: BetaFlagsConfig = Field(default_factory=BetaFlagsConfig)
+    alpha: AlphaFlagsConfig = Field(default_factory=AlphaFlagsConfig)
+
+
+class Settings(FrozenModel):
     """Main settings class that encompasses all configuration."""
     
     app: AppConfig = Field(default_factory=AppConfig)
@@ -199,21 +246,7 @@ class Settings(BaseModel):
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     features: FeatureFlagsConfig = Field(default_factory=FeatureFlagsConfig)
     logging: dict[str, Any] = {}
-    
-    @validator('*', pre=True)
-    def resolve_env_vars(cls, v):
-        """Resolve environment variables in string values."""
-        if isinstance(v, str) and v.startswith('${') and v.endswith('}'):
-            env_var = v[2:-1]
-            default_val = None
-            
-            # Handle ${VAR:default} syntax
-            if ':' in env_var:
-                env_var, default_val = env_var.split(':', 1)
-            
-            return os.getenv(env_var, default_val)
-        return v
-    
+
     def create_directories(self) -> None:
         """Create necessary directories based on configuration."""
         dirs_to_create = [
@@ -241,6 +274,8 @@ class ConfigManager:
     def __init__(self):
         self._settings: Optional[Settings] = None
         self._environment = self._detect_environment()
+        self._dirs_created = False
+        self._logging_configured = False
         
     def _detect_environment(self) -> str:
         """Detect the current environment from various sources."""
@@ -257,10 +292,15 @@ class ConfigManager:
         elif os.getenv('DEBUG') == 'true':
             return 'development'
             
-        # 3. Default based on common development indicators
-        if any(os.path.exists(f) for f in ['.git', 'pyproject.toml', 'main.py']):
+        # 3. Default based on common development indicators (single scandir
+        # instead of one stat syscall per marker file)
+        try:
+            names = {entry.name for entry in os.scandir('.')}
+        except OSError:
+            names = set()
+        if names & {'.git', 'pyproject.toml', 'main.py'}:
             return 'development'
-            
+
         return 'production'
     
     def _load_yaml_config(self, file_path: Path) -> dict[str, Any]:
@@ -270,7 +310,7 @@ class ConfigManager:
             
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+                return yaml.load(f, Loader=YamlLoader) or {}
         except yaml.YAMLError as e:
             raise RuntimeError(f"Error parsing YAML config {file_path}: {e}")
         except Exception as e:
@@ -313,36 +353,95 @@ class ConfigManager:
             config['storage']['database_url'] = db_url
             
         return config
-    
+
+    def _resolve_env_vars_tree(self, obj: Any) -> Any:
+        """Resolve ${VAR}/${VAR:default} placeholders in one recursive pass.
+
+        Running this once on the merged config dict means Pydantic never
+        needs a per-field validation hook for env substitution.
+        """
+        if isinstance(obj, dict):
+            return {key: self._resolve_env_vars_tree(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [self._resolve_env_vars_tree(item) for item in obj]
+        if isinstance(obj, str):
+            match = _ENV_VAR_PATTERN.match(obj)
+            if match:
+                return os.getenv(match.group(1), match.group(2))
+        return obj
+
+    def _config_cache_key(self, config_files: list[Path]) -> str:
+        """Compute a cache key from the raw bytes of the config files."""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(self._environment.encode())
+        for file_path in config_files:
+            if file_path.exists():
+                hasher.update(file_path.read_bytes())
+        return hasher.hexdigest()
+
+    def _read_config_cache(self, cache_path: Path) -> Optional[dict[str, Any]]:
+        """Read a previously cached merged config, or None on miss."""
+        try:
+            data = cache_path.read_bytes()
+            return orjson.loads(data) if orjson else json.loads(data)
+        except (OSError, ValueError):
+            return None
+
+    def _write_config_cache(self, cache_path: Path, config: dict[str, Any]) -> None:
+        """Best-effort write of the merged config cache."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            data = orjson.dumps(config) if orjson else json.dumps(config).encode()
+            cache_path.write_bytes(data)
+        except (OSError, TypeError):
+            pass  # Cache is an optimization only; never fail startup for it
+
     def load_settings(self) -> Settings:
         """Load and return the application settings."""
         if self._settings is not None:
             return self._settings
-            
+
         config_dir = Path(__file__).parent.parent.parent / 'config'
-        
-        # Load base configuration
-        base_config = self._load_yaml_config(config_dir / 'default.yaml')
-        
-        # Load environment-specific overrides
-        env_config = self._load_yaml_config(config_dir / f'{self._environment}.yaml')
-        
-        # Merge configurations
-        merged_config = self._merge_configs(base_config, env_config)
-        
+        config_files = [config_dir / 'default.yaml', config_dir / f'{self._environment}.yaml']
+
+        # Fast path: reuse the merged config cached from a previous run,
+        # skipping YAML parsing entirely when the config files are unchanged
+        cache_key = self._config_cache_key(config_files)
+        cache_path = Path.home() / '.cache' / 'campaign' / f'settings-{cache_key}.json'
+        merged_config = self._read_config_cache(cache_path)
+
+        if merged_config is None:
+            # Load base configuration
+            base_config = self._load_yaml_config(config_files[0])
+
+            # Load environment-specific overrides
+            env_config = self._load_yaml_config(config_files[1])
+
+            # Merge configurations
+            merged_config = self._merge_configs(base_config, env_config)
+
+            # Cache before secrets are applied so keys never hit disk
+            self._write_config_cache(cache_path, merged_config)
+
         # Load secrets from environment
         merged_config = self._load_environment_secrets(merged_config)
-        
+
+        # Resolve ${VAR} placeholders once, before validation
+        merged_config = self._resolve_env_vars_tree(merged_config)
+
         # Create settings instance
         self._settings = Settings(**merged_config)
         
-        # Create required directories
-        self._settings.create_directories()
-        
-        # Configure logging
-        if self._settings.logging:
+        # Create required directories (once per process)
+        if not self._dirs_created:
+            self._settings.create_directories()
+            self._dirs_created = True
+
+        # Configure logging (once per process)
+        if self._settings.logging and not self._logging_configured:
             logging.config.dictConfig(self._settings.logging)
-        
+            self._logging_configured = True
+
         return self._settings
     
     @property
@@ -353,12 +452,14 @@ class ConfigManager:
     def reload(self) -> Settings:
         """Force reload of settings."""
         self._settings = None
+        get_settings.cache_clear()
         return self.load_settings()
 
 
 # Global configuration manager instance
 config_manager = ConfigManager()
 
+@functools.lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Get the current application settings."""
     return config_manager.load_settings()
@@ -3,16 +3,115 @@ Document processing module for campaign content ingestion.
 Handles PDF, markdown, and text file processing with metadata extraction.
 """
 
+import functools
+import html as html_module
+import logging
+import mmap
+import pickle
 import os
+import re
+import sys
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
 
-import PyPDF2
-import markdown
-from bs4 import BeautifulSoup
+import numpy as np
+
+# PyPDF2/fitz/markdown/selectolax are imported lazily inside the
+# _process_* methods — importing this module stays cheap for callers
+# that never parse a document (CLI help, tests, workers before first use)
+
+logger = logging.getLogger(__name__)
+
+try:
+    # blake3's mmap path tree-hashes with SIMD across threads (multi-GB/s)
+    import blake3
+except ImportError:
+    blake3 = None
+
+try:
+    # xxh3 hashes at memory bandwidth; blake2b is the stdlib fallback
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Fallback tag stripping for rendered markdown when selectolax is absent
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Sentence/paragraph boundaries used by the chunker
+_BOUNDARY_RE = re.compile(r'[.!?\n]')
+
+# First markdown H1 or frontmatter title line, whichever comes first
+_TITLE_RE = re.compile(r'^(?:#\s+(?P<heading>.+)|title:\s*(?P<front>.+))$', re.MULTILINE)
+
+
+def _compute_chunk_ranges(boundaries: np.ndarray, n: int, chunk_size: int,
+                          overlap: int, lookback: int) -> np.ndarray:
+    """Compute (start, end) windows over a sorted boundary-offset array.
+
+    Pure numeric loop so numba can JIT it when available; string slicing
+    stays in the caller.
+    """
+    step = chunk_size - lookback - overlap
+    if step < 1:
+        step = 1
+    out = np.empty((n // step + 2, 2), dtype=np.int64)
+
+    count = 0
+    start = 0
+    while start < n and count < out.shape[0]:
+        end = start + chunk_size
+        if end < n and boundaries.size:
+            idx = np.searchsorted(boundaries, end, side='right') - 1
+            low = start + chunk_size - lookback
+            if low < start:
+                low = start
+            if idx >= 0 and boundaries[idx] > low:
+                end = boundaries[idx]
+        out[count, 0] = start
+        out[count, 1] = end
+        count += 1
+        start = end - overlap
+
+    return out[:count]
+
+
+try:
+    # JIT the windowing loop when numba is installed; the plain-Python
+    # version above is the fallback
+    from numba import njit
+
+    _compute_chunk_ranges = njit(cache=True)(_compute_chunk_ranges)
+except ImportError:
+    pass
+
+# Content classification keywords, in priority order; each category is a
+# single compiled alternation so classification scans the text with the
+# regex engine instead of one Python substring pass per keyword. Plain
+# substring matching (no word anchors) on purpose: plurals and compounds
+# like "NPCs" or "encounters" must keep matching as they always have
+_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(words), re.IGNORECASE))
+    for category, words in [
+        ('character', ['npc', 'character', 'villain', 'ally']),
+        ('location', ['location', 'city', 'town', 'dungeon', 'map']),
+        ('encounter', ['encounter', 'combat', 'monster', 'creature']),
+        ('lore', ['lore', 'history', 'legend', 'mythology']),
+        ('adventure', ['quest', 'adventure', 'mission', 'campaign']),
+    ]
+]
+
+
+def _process_file_safe(processor: "DocumentProcessor", file_path: str) -> Optional["Document"]:
+    """Process one file, returning None on failure (worker-safe wrapper)."""
+    try:
+        return processor.process_file(file_path)
+    except Exception as e:
+        logger.warning("Error processing %s: %s", file_path, e)
+        return None
 
 
 @dataclass
@@ -30,7 +129,11 @@ class Document:
 
 class DocumentProcessor:
     """Processes various document types for campaign content ingestion."""
-    
+
+    # Shared cache of lowercased extension sets, keyed by the configured
+    # format list — instances (one per pool worker) reuse one frozenset
+    _EXT_CACHE: Dict[tuple, frozenset] = {}
+
     def __init__(self, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None, settings=None):
         # Import here to avoid circular dependency
         from ..config.settings import get_settings
@@ -40,21 +143,63 @@ class DocumentProcessor:
         
         self.chunk_size = chunk_size or settings.processing.chunking.chunk_size
         self.chunk_overlap = chunk_overlap or settings.processing.chunking.chunk_overlap
-        self.supported_extensions = set(settings.processing.supported_formats)
+        formats_key = tuple(sorted(settings.processing.supported_formats))
+        cached_exts = self._EXT_CACHE.get(formats_key)
+        if cached_exts is None:
+            cached_exts = frozenset(ext.lower() for ext in formats_key)
+            self._EXT_CACHE[formats_key] = cached_exts
+        self.supported_extensions = cached_exts
+
+        # Worker count for parallel directory ingestion (0/1 = serial)
+        try:
+            self.ingest_workers = int(os.getenv('CAMPAIGN_INGEST_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+        except ValueError:
+            self.ingest_workers = 1
     
+    def _doc_cache_path(self, doc_id: str) -> Path:
+        """Location of the cached processing result for a content hash."""
+        key = f"{doc_id}_{self.chunk_size}_{self.chunk_overlap}"
+        return Path.home() / '.cache' / 'campaign' / 'docs' / f'{key}.pkl'
+
+    def _load_cached_document(self, cache_path: Path, file_path: str) -> Optional[Document]:
+        """Load a cached Document, refreshed with the current file path."""
+        try:
+            with open(cache_path, 'rb') as file:
+                document = pickle.load(file)
+            document.file_path = file_path
+            return document
+        except (OSError, pickle.PickleError, AttributeError):
+            return None
+
+    def _store_cached_document(self, cache_path: Path, document: Document) -> None:
+        """Best-effort write of a processing result to the disk cache."""
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'wb') as file:
+                pickle.dump(document, file)
+        except (OSError, pickle.PickleError):
+            pass  # Cache misses just mean re-processing next run
+
     def process_file(self, file_path: str) -> Optional[Document]:
         """Process a single file and return a Document object."""
         path = Path(file_path)
-        
+
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        
+
         if path.suffix.lower() not in self.supported_extensions:
             raise ValueError(f"Unsupported file type: {path.suffix}")
-        
+
         # Generate document ID from file hash
         doc_id = self._generate_document_id(file_path)
-        
+
+        # Processing is idempotent given (content, chunk params), so an
+        # unchanged file can reuse its previous result from disk
+        cache_path = self._doc_cache_path(doc_id)
+        cached = self._load_cached_document(cache_path, file_path)
+        if cached is not None:
+            return cached
+
         # Extract content based on file type
         if path.suffix.lower() == '.pdf':
             content, title = self._process_pdf(file_path)
@@ -63,160 +208,223 @@ class DocumentProcessor:
         else:  # .txt
             content, title = self._process_text(file_path)
         
-        # Extract metadata
-        metadata = self._extract_metadata(file_path, content)
+        # Extract metadata (stat once; reused for size and mtime)
+        metadata = self._extract_metadata(path, path.stat(), content)
         
         # Create chunks
         chunks = self._create_chunks(content)
-        
-        return Document(
+
+        document = Document(
             id=doc_id,
             title=title or path.stem,
             content=content,
             file_path=file_path,
-            file_type=path.suffix.lower(),
+            file_type=sys.intern(path.suffix.lower()),
             created_at=datetime.now(),
             metadata=metadata,
             chunks=chunks
         )
+
+        self._store_cached_document(cache_path, document)
+
+        return document
     
-    def process_directory(self, directory_path: str, recursive: bool = True) -> List[Document]:
-        """Process all supported files in a directory."""
+    def process_directory(self,
+                          directory_path: str,
+                          recursive: bool = True,
+                          max_workers: Optional[int] = None) -> List[Document]:
+        """Process all supported files in a directory.
+
+        max_workers overrides the CAMPAIGN_INGEST_WORKERS default for
+        this call; 0 or 1 forces serial processing.
+        """
+        workers = self.ingest_workers if max_workers is None else max_workers
         path = Path(directory_path)
         documents = []
         
         if not path.exists() or not path.is_dir():
             raise ValueError(f"Invalid directory: {directory_path}")
         
-        pattern = "**/*" if recursive else "*"
-        
-        for file_path in path.glob(pattern):
-            if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
-                try:
-                    doc = self.process_file(str(file_path))
-                    if doc:
-                        documents.append(doc)
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
-        
+        # Walk with scandir-backed os.walk so file-type info comes from the
+        # directory read itself — no extra stat per candidate file
+        file_paths = []
+        if recursive:
+            for root, _dirs, files in os.walk(path):
+                for name in files:
+                    if os.path.splitext(name)[1].lower() in self.supported_extensions:
+                        file_paths.append(os.path.join(root, name))
+        else:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file() and os.path.splitext(entry.name)[1].lower() in self.supported_extensions:
+                        file_paths.append(entry.path)
+        file_paths.sort()
+
+        if len(file_paths) > 1 and workers > 1:
+            # Parsing is CPU-bound and per-file independent; fan out across cores
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(
+                    functools.partial(_process_file_safe, self),
+                    file_paths,
+                    chunksize=4
+                )
+                documents = [doc for doc in results if doc]
+        else:
+            for file_path in file_paths:
+                doc = _process_file_safe(self, file_path)
+                if doc:
+                    documents.append(doc)
+
         return documents
     
     def _process_pdf(self, file_path: str) -> tuple[str, Optional[str]]:
         """Extract text content from PDF file."""
-        content = ""
+        try:
+            # PyMuPDF extracts text 5-30x faster than PyPDF2 via its C backend
+            import fitz
+        except ImportError:
+            fitz = None
+
+        if fitz is not None:
+            # Context manager closes the document promptly (no GC reliance);
+            # fitz's per-process store then caches fonts/xrefs across the
+            # files each pool worker handles
+            with fitz.open(file_path) as doc:
+                title = (doc.metadata or {}).get('title') or None
+                parts = [page.get_text("text") for page in doc]
+            return "\n".join(parts).strip(), title
+
+        # Fallback: PyPDF2
+        import PyPDF2
+
         title = None
-        
+
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            
+
             # Try to get title from PDF metadata
             if pdf_reader.metadata:
                 title = pdf_reader.metadata.get('/Title')
-            
-            # Extract text from all pages
-            for page in pdf_reader.pages:
-                content += page.extract_text() + "\n"
-        
-        return content.strip(), title
+
+            # Extract text from all pages; accumulate into a list so the
+            # build stays linear instead of re-copying the string per page
+            parts = [page.extract_text() for page in pdf_reader.pages]
+
+        return "\n".join(parts).strip(), title
     
+    def _read_text_file(self, file_path: str) -> str:
+        """Read a whole text file via mmap, avoiding buffered-read copies."""
+        with open(file_path, 'rb') as file:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return ''  # empty file cannot be mapped
+            with mapped:
+                return mapped[:].decode('utf-8')
+
     def _process_markdown(self, file_path: str) -> tuple[str, Optional[str]]:
         """Extract content from markdown file."""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            raw_content = file.read()
+        import markdown
+        try:
+            # lexbor-backed HTML parsing; far faster and lighter than BeautifulSoup
+            from selectolax.parser import HTMLParser
+        except ImportError:
+            HTMLParser = None
+
+        raw_content = self._read_text_file(file_path)
         
-        # Convert markdown to HTML then extract text
+        # Convert markdown to HTML then extract text (no BeautifulSoup:
+        # rendered markdown is well-formed, so a C parser or a plain tag
+        # strip is enough)
         html = markdown.markdown(raw_content, extensions=['meta', 'toc'])
-        soup = BeautifulSoup(html, 'html.parser')
-        content = soup.get_text()
+        if HTMLParser is not None:
+            content = HTMLParser(html).text(separator=' ')
+        else:
+            content = html_module.unescape(_TAG_RE.sub(' ', html))
         
-        # Try to extract title from first heading or frontmatter
+        # Try to extract title from first heading or frontmatter; one
+        # MULTILINE regex pass instead of materializing the split lines
         title = None
-        lines = raw_content.split('\n')
-        for line in lines:
-            if line.startswith('# '):
-                title = line[2:].strip()
-                break
-            elif line.startswith('title:'):
-                title = line[6:].strip().strip('"\'')
-                break
-        
+        match = _TITLE_RE.search(raw_content)
+        if match:
+            if match.group('heading') is not None:
+                title = match.group('heading').strip()
+            else:
+                title = match.group('front').strip().strip('"\'')
+
         return content.strip(), title
     
     def _process_text(self, file_path: str) -> tuple[str, Optional[str]]:
         """Extract content from text file."""
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        
+        content = self._read_text_file(file_path)
+
         # Use filename as title
         title = Path(file_path).stem
         
         return content.strip(), title
     
-    def _extract_metadata(self, file_path: str, content: str) -> Dict[str, Any]:
+    def _extract_metadata(self, path: Path, stat: os.stat_result, content: str) -> Dict[str, Any]:
         """Extract metadata from file and content."""
-        path = Path(file_path)
-        stat = path.stat()
-        
         metadata = {
             'file_size': stat.st_size,
             'modified_at': datetime.fromtimestamp(stat.st_mtime),
             'word_count': len(content.split()),
             'character_count': len(content),
             'file_name': path.name,
-            'file_extension': path.suffix.lower()
+            'file_extension': sys.intern(path.suffix.lower())
         }
-        
-        # Simple content classification
-        content_lower = content.lower()
-        metadata['content_type'] = self._classify_content(content_lower)
+
+        # Simple content classification (interned: these few category
+        # strings recur across every document and result). The patterns
+        # are case-insensitive, so no lowered copy of the text is made.
+        metadata['content_type'] = sys.intern(self._classify_content(content))
         
         return metadata
     
     def _classify_content(self, content: str) -> str:
         """Basic content type classification."""
-        # Simple keyword-based classification
-        if any(word in content for word in ['npc', 'character', 'villain', 'ally']):
-            return 'character'
-        elif any(word in content for word in ['location', 'city', 'town', 'dungeon', 'map']):
-            return 'location'
-        elif any(word in content for word in ['encounter', 'combat', 'monster', 'creature']):
-            return 'encounter'
-        elif any(word in content for word in ['lore', 'history', 'legend', 'mythology']):
-            return 'lore'
-        elif any(word in content for word in ['quest', 'adventure', 'mission', 'campaign']):
-            return 'adventure'
-        else:
-            return 'general'
+        for category, pattern in _CATEGORY_PATTERNS:
+            if pattern.search(content):
+                return category
+        return 'general'
     
     def _create_chunks(self, content: str) -> List[str]:
         """Split content into overlapping chunks for better retrieval."""
         if len(content) <= self.chunk_size:
             return [content]
         
+        # Precompute every sentence/paragraph boundary once, then run the
+        # purely numeric windowing loop (JIT-compiled when numba is
+        # present) and slice the content per resulting range
+        boundaries = np.fromiter(
+            (m.end() for m in _BOUNDARY_RE.finditer(content)), dtype=np.int64
+        )
+        ranges = _compute_chunk_ranges(
+            boundaries, len(content), self.chunk_size, self.chunk_overlap, 100
+        )
+
         chunks = []
-        start = 0
-        
-        while start < len(content):
-            end = start + self.chunk_size
-            
-            # Try to break at sentence or paragraph boundaries
-            if end < len(content):
-                # Look for sentence endings near the chunk boundary
-                for i in range(end, max(start + self.chunk_size - 100, start), -1):
-                    if content[i] in '.!?\n':
-                        end = i + 1
-                        break
-            
+        for start, end in ranges:
             chunk = content[start:end].strip()
             if chunk:
                 chunks.append(chunk)
-            
-            start = end - self.chunk_overlap
-        
+
         return chunks
     
     def _generate_document_id(self, file_path: str) -> str:
-        """Generate a unique ID for the document based on file path and modification time."""
-        path = Path(file_path)
-        id_string = f"{file_path}_{path.stat().st_mtime}"
-        return hashlib.md5(id_string.encode()).hexdigest()
\ No newline at end of file
+        """Generate a unique ID from the file's content hash.
+
+        Content hashing is stable across renames and mtime churn; the
+        file is streamed in 1 MiB blocks so large PDFs never load twice.
+        """
+        if blake3 is not None:
+            # mmap fast path: SIMD tree hash, parallel across threads
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            hasher.update_mmap(file_path)
+            return hasher.hexdigest(length=16)
+
+        hasher = xxhash.xxh3_128() if xxhash else hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                hasher.update(block)
+        return hasher.hexdigest()
\ No newline at end of file
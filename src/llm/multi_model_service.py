@@ -1,8 +1,11 @@
+import logging
 from typing import Dict, Any, Optional
 from .base import BaseLLMService, LLMResponse
 from .ollama_service import OllamaService
 from ..config.settings import Settings
 
+logger = logging.getLogger(__name__)
+
 
 class MultiModelOllamaService(BaseLLMService):
     """Multi-model Ollama service with task-specific model selection"""
@@ -47,13 +50,16 @@ class MultiModelOllamaService(BaseLLMService):
         # Fall back through fallback chain
         for fallback in self.fallback_models:
             if self.ollama_service.is_model_available(fallback):
-                print(f"⚠️  Preferred model '{preferred_model}' not available, using '{fallback}'")
+                logger.warning(
+                    "Preferred model '%s' not available, using '%s'",
+                    preferred_model, fallback
+                )
                 return fallback
         
         # Final fallback to any available model
         available = self.ollama_service.get_available_models()
         if available:
-            print(f"⚠️  Using first available model: '{available[0]}'")
+            logger.warning("Using first available model: '%s'", available[0])
             return available[0]
         
         raise RuntimeError("No Ollama models available")
@@ -69,31 +75,25 @@ class MultiModelOllamaService(BaseLLMService):
         """Generate text response with task-specific model selection"""
         
         model = self.get_model_for_task(intent)
-        
-        # Update the ollama service model temporarily
-        original_model = self.ollama_service.model_name
-        self.ollama_service.model_name = model
-        
-        try:
-            response = await self.ollama_service.generate(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            
-            # Update response metadata with actual model used
-            if response.metadata is None:
-                response.metadata = {}
-            response.metadata["actual_model"] = model
-            response.metadata["intent"] = intent
-            response.model = model
-            
-            return response
-            
-        finally:
-            # Restore original model
-            self.ollama_service.model_name = original_model
+
+        # Pass the model per call — no shared mutable state, so concurrent
+        # coroutines cannot route each other's requests to the wrong model
+        response = await self.ollama_service.generate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            model=model
+        )
+
+        # Update response metadata with actual model used
+        if response.metadata is None:
+            response.metadata = {}
+        response.metadata["actual_model"] = model
+        response.metadata["intent"] = intent
+        response.model = model
+
+        return response
     
     async def generate_with_context(
         self,
@@ -109,33 +109,25 @@ class MultiModelOllamaService(BaseLLMService):
         # Use rag_qa task for context-based generation
         rag_intent = "rag_qa" if intent == "general" else intent
         model = self.get_model_for_task(rag_intent)
-        
-        # Update the ollama service model temporarily
-        original_model = self.ollama_service.model_name
-        self.ollama_service.model_name = model
-        
-        try:
-            response = await self.ollama_service.generate_with_context(
-                prompt=prompt,
-                context_documents=context_documents,
-                system_prompt=system_prompt,
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-            
-            # Update response metadata
-            if response.metadata is None:
-                response.metadata = {}
-            response.metadata["actual_model"] = model
-            response.metadata["intent"] = intent
-            response.metadata["task_type"] = "rag"
-            response.model = model
-            
-            return response
-            
-        finally:
-            # Restore original model
-            self.ollama_service.model_name = original_model
+
+        response = await self.ollama_service.generate_with_context(
+            prompt=prompt,
+            context_documents=context_documents,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            model=model
+        )
+
+        # Update response metadata
+        if response.metadata is None:
+            response.metadata = {}
+        response.metadata["actual_model"] = model
+        response.metadata["intent"] = intent
+        response.metadata["task_type"] = "rag"
+        response.model = model
+
+        return response
     
     def is_available(self) -> bool:
         """Check if the service is available"""
@@ -145,18 +137,31 @@ class MultiModelOllamaService(BaseLLMService):
         """Get list of available models"""
         return self.ollama_service.get_available_models()
     
+    def _resolve_model(self, task: str, available: frozenset) -> Optional[str]:
+        """Resolve a task to its effective model against a fixed model set"""
+        preferred = self.models_config.get(task, self.models_config["default"])
+        if preferred in available:
+            return preferred
+
+        for fallback in self.fallback_models:
+            if fallback in available:
+                return fallback
+
+        return next(iter(available), None)
+
     def get_task_model_status(self) -> Dict[str, Dict[str, Any]]:
         """Get status of all task-specific models"""
         status = {}
-        available_models = self.ollama_service.get_available_models()
-        
+        # One set snapshot shared by every task check: O(T + M), not O(T x M)
+        available = self.ollama_service.get_available_model_set()
+
         for task, model in self.models_config.items():
             status[task] = {
                 "preferred_model": model,
-                "available": model in available_models,
-                "actual_model": self.get_model_for_task(task) if available_models else None
+                "available": model in available,
+                "actual_model": self._resolve_model(task, available) if available else None
             }
-        
+
         return status
     
     def suggest_missing_models(self) -> list[str]:
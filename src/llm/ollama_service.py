@@ -1,26 +1,53 @@
-import asyncio
 from typing import Dict, Any, Optional
 import ollama
 from .base import BaseLLMService, LLMResponse
 
 
+# Built once at import; generate_with_context reuses it on every call
+_RAG_SYSTEM_PROMPT = """You are a D&D Campaign Assistant. Use the provided context documents to answer questions and help with campaign management.
+
+Guidelines:
+- Base your responses primarily on the provided context
+- Maintain the tone and style consistent with the campaign setting
+- If context is insufficient, clearly state what additional information would be helpful
+- Provide specific references to source material when relevant
+- Be creative but stay true to established lore and narrative"""
+
+_RAG_PROMPT_TEMPLATE = """Context Documents:
+{context}
+
+---
+
+Question/Request: {prompt}
+
+Please provide a helpful response based on the context above."""
+
+
 class OllamaService(BaseLLMService):
     """Ollama local LLM service implementation"""
     
     def __init__(self, model_name: str = "llama2", host: str = "localhost:11434", **kwargs):
         super().__init__(model_name, **kwargs)
         self.host = host
+        # Sync client for the rare list()/pull() admin calls; async client
+        # for generation so requests share the event loop natively
         self.client = ollama.Client(host=host)
+        self.aclient = ollama.AsyncClient(host=host)
         self._available_models = None
+        self._available_model_set = None
     
     async def generate(
-        self, 
-        prompt: str, 
+        self,
+        prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None,
+        keep_alive: Optional[str] = None
     ) -> LLMResponse:
         """Generate text response from prompt"""
+        # Per-call model override keeps concurrent coroutines independent
+        model = model or self.model_name
         messages = []
         
         if system_prompt:
@@ -33,19 +60,16 @@ class OllamaService(BaseLLMService):
             options["num_predict"] = max_tokens
         
         try:
-            # Run in thread pool since ollama.chat is synchronous
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: self.client.chat(
-                    model=self.model_name,
-                    messages=messages,
-                    options=options
-                )
+            response = await self.aclient.chat(
+                model=model,
+                messages=messages,
+                options=options,
+                keep_alive=keep_alive
             )
-            
+
             return LLMResponse(
                 content=response["message"]["content"],
-                model=self.model_name,
+                model=model,
                 tokens_used=response.get("eval_count"),
                 metadata={
                     "total_duration": response.get("total_duration"),
@@ -63,41 +87,28 @@ class OllamaService(BaseLLMService):
         context_documents: list[str],
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        model: Optional[str] = None
     ) -> LLMResponse:
         """Generate response with RAG context"""
         
         # Build context string from documents
         context = "\n\n".join([f"Document {i+1}:\n{doc}" for i, doc in enumerate(context_documents)])
-        
-        # Enhanced system prompt for RAG
-        rag_system_prompt = """You are a D&D Campaign Assistant. Use the provided context documents to answer questions and help with campaign management.
 
-Guidelines:
-- Base your responses primarily on the provided context
-- Maintain the tone and style consistent with the campaign setting
-- If context is insufficient, clearly state what additional information would be helpful
-- Provide specific references to source material when relevant
-- Be creative but stay true to established lore and narrative"""
-        
         if system_prompt:
-            rag_system_prompt = f"{rag_system_prompt}\n\nAdditional instructions: {system_prompt}"
-        
-        # Build the full prompt with context
-        full_prompt = f"""Context Documents:
-{context}
+            rag_system_prompt = f"{_RAG_SYSTEM_PROMPT}\n\nAdditional instructions: {system_prompt}"
+        else:
+            rag_system_prompt = _RAG_SYSTEM_PROMPT
 
----
-
-Question/Request: {prompt}
-
-Please provide a helpful response based on the context above."""
+        # Build the full prompt with context
+        full_prompt = _RAG_PROMPT_TEMPLATE.format(context=context, prompt=prompt)
         
         return await self.generate(
             prompt=full_prompt,
             system_prompt=rag_system_prompt,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            model=model
         )
     
     def is_available(self) -> bool:
@@ -136,11 +147,17 @@ Please provide a helpful response based on the context above."""
                 self._available_models = []
         return self._available_models
     
+    def get_available_model_set(self) -> frozenset:
+        """Get the available models as a frozenset for O(1) membership"""
+        if self._available_model_set is None:
+            self._available_model_set = frozenset(self.get_available_models())
+        return self._available_model_set
+
     def is_model_available(self, model_name: str) -> bool:
         """Check if specific model is available"""
-        available = self.get_available_models()
-        return model_name in available
-    
+        return model_name in self.get_available_model_set()
+
     def refresh_model_cache(self):
         """Force refresh of available models cache"""
-        self._available_models = None
\ No newline at end of file
+        self._available_models = None
+        self._available_model_set = None
\ No newline at end of file
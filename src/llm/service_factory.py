@@ -13,7 +13,7 @@ class LLMServiceFactory:
         """Create appropriate LLM service based on configuration"""
         
         # Check if LLM integration is enabled
-        if not settings.features.beta.get("llm_integration", False):
+        if not settings.features.beta.llm_integration:
             return None
         
         # Try local LLM first (Ollama with multi-model support)
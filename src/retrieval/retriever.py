@@ -3,13 +3,82 @@ Retrieval system for campaign content.
 Handles query processing and context-aware document retrieval.
 """
 
-import re
+import asyncio
+import heapq
+import string
+import threading
+from collections import Counter, OrderedDict
 from typing import Dict, Optional, Any, Set
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 from ..storage.vector_store import VectorStore
 
+try:
+    # Multi-pattern keyword matching in one linear scan; the plain
+    # per-keyword loop below stays as the fallback
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+def _cosine_scores(candidates: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Dot unit-normalized candidate vectors against a unit query vector."""
+    return candidates @ query
+
+
+def _select_candidates(sims: np.ndarray,
+                       doc_codes: np.ndarray,
+                       boosts: np.ndarray,
+                       n_docs: int,
+                       threshold: float,
+                       max_results: int) -> tuple:
+    """Threshold-filter, dedup by document code, boost, and rank.
+
+    Pure-numeric post-processing kernel: documents are pre-encoded to
+    small ints so the loop carries no Python objects. Returns the kept
+    row indices and their boosted scores, best first. max_results < 0
+    means unbounded.
+    """
+    n = sims.shape[0]
+    seen = np.zeros(n_docs, dtype=np.bool_)
+    kept = np.empty(n, dtype=np.int64)
+    scores = np.empty(n, dtype=np.float32)
+    count = 0
+    for i in range(n):
+        if sims[i] <= threshold:
+            continue
+        doc = doc_codes[i]
+        if seen[doc]:
+            continue
+        seen[doc] = True
+        kept[count] = i
+        scores[count] = sims[i] * boosts[i]
+        count += 1
+
+    order = np.argsort(-scores[:count])
+    if 0 <= max_results < count:
+        order = order[:max_results]
+    return kept[order], scores[:count][order]
+
+
+try:
+    # JIT the numeric kernels when numba is installed; the NumPy
+    # fallbacks above stay in place otherwise
+    from numba import njit
+
+    _cosine_scores = njit(fastmath=True, cache=True)(_cosine_scores)
+    _select_candidates = njit(cache=True)(_select_candidates)
+except ImportError:
+    pass
+
+
+# Below this many candidates the plain Python pass wins; the kernel
+# only pays off once candidate counts reach the hundreds
+_KERNEL_MIN_CANDIDATES = 128
+
 
 class QueryIntent(Enum):
     """Types of queries the system can handle."""
@@ -41,9 +110,78 @@ class RetrievalResult:
     metadata: Dict[str, Any]
 
 
+class QueryVectorCache:
+    """LRU cache of query embeddings and their search results.
+
+    Interactive sessions rephrase the same questions; near-duplicate
+    queries (cosine similarity above the threshold) reuse cached results
+    instead of hitting the ANN index again.
+    """
+
+    def __init__(self, max_entries: int = 1024, similarity_threshold: float = 0.95):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict = OrderedDict()
+        # Concurrent asearch calls run lookups/stores from worker
+        # threads; serialize access so iteration never races an evict
+        self._lock = threading.Lock()
+
+    def lookup(self, embedding: np.ndarray, params: tuple) -> Optional[list]:
+        """Return cached results for a near-duplicate query, or None."""
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return None
+
+        with self._lock:
+            keys = [key for key in self._entries if key[1:] == params]
+            if not keys:
+                return None
+
+            # One batched kernel call over all candidates instead of a
+            # Python-level loop of per-entry dot products
+            candidates = np.ascontiguousarray(
+                np.stack([self._entries[key][0] for key in keys]), dtype=np.float32
+            )
+            query = np.ascontiguousarray(embedding / norm, dtype=np.float32)
+            scores = _cosine_scores(candidates, query)
+
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                self._entries.move_to_end(keys[best])
+                return self._entries[keys[best]][1]
+
+        return None
+
+    def store(self, query: str, embedding: np.ndarray, params: tuple, results: list) -> None:
+        """Cache results for a query embedding."""
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return
+
+        unit_embedding = np.asarray(embedding / norm, dtype=np.float32)
+        with self._lock:
+            self._entries[(query,) + params] = (unit_embedding, results)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop all cached entries (collection contents changed)."""
+        with self._lock:
+            self._entries.clear()
+
+
 class CampaignRetriever:
     """Main retrieval system for campaign content."""
-    
+
+    # Common abbreviations expanded during query preprocessing
+    _ABBREVIATIONS = {
+        'dm': 'dungeon master',
+        'pc': 'player character',
+        'npc': 'non-player character',
+        'hp': 'hit points',
+        'ac': 'armor class'
+    }
+
     def __init__(self, vector_store: VectorStore, settings=None):
         # Import here to avoid circular dependency
         from ..config.settings import get_settings
@@ -54,6 +192,10 @@ class CampaignRetriever:
         self.vector_store = vector_store
         self.context = RetrievalContext()
         self.settings = settings
+
+        # Semantic cache for repeated/near-duplicate queries
+        self._query_cache = QueryVectorCache()
+        self._cache_version = vector_store.version
         
         # Keywords for intent classification
         self.intent_keywords = {
@@ -74,15 +216,33 @@ class CampaignRetriever:
                 'tradition', 'culture', 'religion'
             ]
         }
+
+        # Build the keyword automaton once; a keyword may belong to
+        # several intents (e.g. 'stats'), so each word maps to a tuple
+        self._intent_automaton = None
+        if ahocorasick is not None:
+            keyword_intents: Dict[str, tuple] = {}
+            for intent, keywords in self.intent_keywords.items():
+                for keyword in keywords:
+                    keyword_intents[keyword] = keyword_intents.get(keyword, ()) + (intent,)
+
+            automaton = ahocorasick.Automaton()
+            for keyword, intents in keyword_intents.items():
+                automaton.add_word(keyword, intents)
+            automaton.make_automaton()
+            self._intent_automaton = automaton
     
     def set_context(self, context: RetrievalContext) -> None:
         """Update the retrieval context."""
         self.context = context
+        # Cached results carry boosts computed under the old context
+        self._query_cache.invalidate()
     
-    def search(self, 
-               query: str, 
+    def search(self,
+               query: str,
                max_results: Optional[int] = None,
-               content_type_filter: Optional[str] = None) -> list[RetrievalResult]:
+               content_type_filter: Optional[str] = None,
+               doc_head_only: bool = False) -> list[RetrievalResult]:
         """Main search method with query processing and context awareness."""
         
         # Use config default if not specified
@@ -96,20 +256,45 @@ class CampaignRetriever:
         # Apply content type filtering based on intent
         if not content_type_filter:
             content_type_filter = self._get_content_type_for_intent(intent)
-        
-        # Perform vector search
-        search_results = self.vector_store.search(
-            query=processed_query,
-            n_results=max_results * 2,  # Get more results for filtering
-            content_type=content_type_filter
-        )
-        
-        # Post-process and rank results
-        filtered_results = self._post_process_results(search_results, query, intent)
+
+        # Check the semantic query cache before touching the index
+        if self.vector_store.version != self._cache_version:
+            self._query_cache.invalidate()
+            self._cache_version = self.vector_store.version
+
+        cache_params = (max_results, content_type_filter, doc_head_only)
+        query_embedding = self.vector_store.embed_query(processed_query)
+        cached = self._query_cache.lookup(query_embedding, cache_params)
+        if cached is not None:
+            return cached
+
+        # Adaptive oversample: most candidate sets survive filtering, so
+        # start just above max_results and only widen the search when
+        # post-processing actually rejected too many rows
+        n_results = max_results + (max_results + 3) // 4
+        while True:
+            search_results = self.vector_store.search(
+                query=processed_query,
+                n_results=n_results,
+                content_type=content_type_filter,
+                query_embedding=query_embedding,
+                doc_head_only=doc_head_only
+            )
+
+            # Post-process and rank results
+            filtered_results = self._post_process_results(
+                search_results, query, intent, max_results
+            )
+
+            if (len(filtered_results) >= max_results
+                    or len(search_results) < n_results  # index exhausted
+                    or n_results >= max_results * 4):
+                break
+            n_results *= 2
         
         # Convert to RetrievalResult objects
         retrieval_results = []
-        for result in filtered_results[:max_results]:
+        for result in filtered_results:
             retrieval_result = RetrievalResult(
                 content=result['content'],
                 source_title=result['metadata'].get('document_title', 'Unknown'),
@@ -119,9 +304,62 @@ class CampaignRetriever:
                 metadata=result['metadata']
             )
             retrieval_results.append(retrieval_result)
-        
+
+        self._query_cache.store(processed_query, query_embedding, cache_params, retrieval_results)
+
         return retrieval_results
-    
+
+    async def asearch(self,
+                      query: str,
+                      max_results: Optional[int] = None,
+                      content_type_filter: Optional[str] = None) -> list[RetrievalResult]:
+        """Async search: runs the synchronous pipeline in a worker thread.
+
+        Independent queries awaited via asyncio.gather overlap their
+        embedding and index work instead of running back to back.
+        """
+        return await asyncio.to_thread(
+            self.search,
+            query,
+            max_results=max_results,
+            content_type_filter=content_type_filter
+        )
+
+    def search_batch(self,
+                     queries: list[str],
+                     max_results: Optional[int] = None) -> list[list[RetrievalResult]]:
+        """Search several queries through one batched embed + index call."""
+        if max_results is None:
+            max_results = self.settings.retrieval.search.default_max_results
+
+        processed_queries = [self._preprocess_query(query) for query in queries]
+
+        batched_results = self.vector_store.search_batch(
+            queries=processed_queries,
+            n_results=max_results * 2
+        )
+
+        all_results = []
+        for query, search_results in zip(queries, batched_results):
+            intent = self._classify_intent(query)
+            filtered_results = self._post_process_results(
+                search_results, query, intent, max_results
+            )
+
+            retrieval_results = []
+            for result in filtered_results:
+                retrieval_results.append(RetrievalResult(
+                    content=result['content'],
+                    source_title=result['metadata'].get('document_title', 'Unknown'),
+                    source_path=result['metadata'].get('file_path', ''),
+                    content_type=result['metadata'].get('content_type', 'general'),
+                    relevance_score=result['similarity'],
+                    metadata=result['metadata']
+                ))
+            all_results.append(retrieval_results)
+
+        return all_results
+
     def search_by_entity(self, entity_name: str, entity_type: str = None) -> list[RetrievalResult]:
         """Search for content related to a specific entity (NPC, location, etc.)."""
         query = f"{entity_name}"
@@ -139,34 +377,43 @@ class CampaignRetriever:
     
     def _preprocess_query(self, query: str) -> str:
         """Clean and enhance the query for better search results."""
-        # Basic text cleaning
-        cleaned = re.sub(r'\s+', ' ', query.strip().lower())
-        
-        # Expand common abbreviations
-        abbreviations = {
-            'dm': 'dungeon master',
-            'pc': 'player character',
-            'npc': 'non-player character',
-            'hp': 'hit points',
-            'ac': 'armor class'
-        }
-        
-        for abbr, full in abbreviations.items():
-            cleaned = re.sub(rf'\b{abbr}\b', full, cleaned)
-        
-        return cleaned
+        # split()/join normalizes whitespace implicitly, and a dict hit
+        # per token expands abbreviations with no regex machinery at
+        # all. Surrounding punctuation is stripped for the lookup and
+        # re-attached, so "ac?" still expands like the old \b regex did
+        tokens = []
+        for token in query.lower().split():
+            core = token.strip(string.punctuation)
+            expansion = self._ABBREVIATIONS.get(core) if core else None
+            if expansion is None:
+                tokens.append(token)
+            else:
+                start = token.find(core)
+                tokens.append(token[:start] + expansion + token[start + len(core):])
+        return ' '.join(tokens)
     
     def _classify_intent(self, query: str) -> QueryIntent:
         """Classify the intent of the user's query."""
         query_lower = query.lower()
-        
+
+        # One linear automaton pass over the query instead of an
+        # O(intents x keywords) substring scan
+        if self._intent_automaton is not None:
+            intent_scores = Counter()
+            for _, intents in self._intent_automaton.iter(query_lower):
+                for intent in intents:
+                    intent_scores[intent] += 1
+            if intent_scores:
+                return max(intent_scores, key=intent_scores.get)
+            return QueryIntent.GENERAL_SEARCH
+
         # Score each intent based on keyword matches
         intent_scores = {}
         for intent, keywords in self.intent_keywords.items():
             score = sum(1 for keyword in keywords if keyword in query_lower)
             if score > 0:
                 intent_scores[intent] = score
-        
+
         # Return the highest scoring intent, or general search if no matches
         if intent_scores:
             return max(intent_scores, key=intent_scores.get)
@@ -200,62 +447,109 @@ class CampaignRetriever:
         
         return enhanced_query
     
-    def _post_process_results(self, 
-                             results: list[Dict[str, Any]], 
-                             original_query: str, 
-                             intent: QueryIntent) -> list[Dict[str, Any]]:
+    def _post_process_results(self,
+                             results: list[Dict[str, Any]],
+                             original_query: str,
+                             intent: QueryIntent,
+                             max_results: Optional[int] = None) -> list[Dict[str, Any]]:
         """Post-process search results for relevance and context."""
-        
-        # Filter out very low similarity results
+
         threshold = self.settings.retrieval.search.similarity_threshold
-        filtered_results = [r for r in results if r['similarity'] > threshold]
-        
-        # Apply context-based boosting
-        for result in filtered_results:
-            boost_score = self._calculate_context_boost(result)
-            result['similarity'] *= boost_score
-        
-        # Remove duplicates (same document, different chunks)
-        unique_results = self._deduplicate_results(filtered_results)
-        
-        # Sort by final similarity score
-        unique_results.sort(key=lambda x: x['similarity'], reverse=True)
-        
-        return unique_results
+
+        # Large candidate sets go through the compiled numeric kernel
+        if len(results) >= _KERNEL_MIN_CANDIDATES:
+            return self._post_process_results_kernel(results, threshold, max_results)
+
+        # Fused pass: threshold filter and document-level dedup in one
+        # iteration instead of separate list rebuilds
+        seen_documents = set()
+        survivors = []
+        for result in results:
+            if result['similarity'] <= threshold:
+                continue
+            doc_id = result['metadata']['document_id']
+            if doc_id in seen_documents:
+                continue
+            seen_documents.add(doc_id)
+            survivors.append(result)
+
+        if not survivors:
+            return []
+
+        # Apply context-based boosting across the batch in one pass
+        boosts = self._calculate_context_boosts(survivors)
+        for result, boost in zip(survivors, boosts.tolist()):
+            result['similarity'] *= boost
+
+        # Top-k selection is O(N log k) vs a full sort's O(N log N)
+        if max_results is not None:
+            return heapq.nlargest(max_results, survivors, key=lambda x: x['similarity'])
+
+        survivors.sort(key=lambda x: x['similarity'], reverse=True)
+        return survivors
+
+    def _post_process_results_kernel(self,
+                                     results: list[Dict[str, Any]],
+                                     threshold: float,
+                                     max_results: Optional[int]) -> list[Dict[str, Any]]:
+        """Array-based post-processing for large candidate batches."""
+        similarities = np.fromiter(
+            (result['similarity'] for result in results),
+            dtype=np.float32,
+            count=len(results)
+        )
+
+        # Factorize document ids to small ints so the kernel loop is
+        # integer-only
+        doc_index: Dict[str, int] = {}
+        doc_codes = np.empty(len(results), dtype=np.int64)
+        for i, result in enumerate(results):
+            doc_id = result['metadata']['document_id']
+            doc_codes[i] = doc_index.setdefault(doc_id, len(doc_index))
+
+        boosts = self._calculate_context_boosts(results)
+
+        kept, scores = _select_candidates(
+            similarities,
+            doc_codes,
+            boosts,
+            len(doc_index),
+            np.float32(threshold),
+            -1 if max_results is None else max_results
+        )
+
+        out = []
+        for row, score in zip(kept.tolist(), scores.tolist()):
+            result = results[row]
+            result['similarity'] = score
+            out.append(result)
+        return out
     
-    def _calculate_context_boost(self, result: Dict[str, Any]) -> float:
-        """Calculate boost score based on current context."""
-        boost = 1.0
-        metadata = result['metadata']
-        
+    def _calculate_context_boosts(self, results: list[Dict[str, Any]]) -> np.ndarray:
+        """Calculate boost scores for a whole candidate batch at once."""
+        boosts = np.ones(len(results), dtype=np.float32)
+        metadatas = [result['metadata'] for result in results]
+
         # Boost results from current campaign
-        if (self.context.current_campaign and 
-            self.context.current_campaign.lower() in metadata.get('document_title', '').lower()):
-            boost *= 1.2
-        
+        if self.context.current_campaign:
+            campaign = self.context.current_campaign.lower()
+            titles = np.array([m.get('document_title', '').lower() for m in metadatas])
+            boosts *= np.where(np.char.find(titles, campaign) >= 0,
+                               np.float32(1.2), np.float32(1.0))
+
         # Boost recently created or modified content
         # (This would require additional metadata tracking)
-        
+
         # Boost based on content type preferences
         if self.context.content_preferences:
-            content_type = metadata.get('content_type', 'general')
-            if content_type in self.context.content_preferences:
-                boost *= self.context.content_preferences[content_type]
-        
-        return boost
-    
-    def _deduplicate_results(self, results: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
-        """Remove duplicate results from the same document."""
-        seen_documents = set()
-        unique_results = []
-        
-        for result in results:
-            doc_id = result['metadata']['document_id']
-            if doc_id not in seen_documents:
-                seen_documents.add(doc_id)
-                unique_results.append(result)
-        
-        return unique_results
+            preferences = self.context.content_preferences
+            boosts *= np.fromiter(
+                (preferences.get(m.get('content_type', 'general'), 1.0) for m in metadatas),
+                dtype=np.float32,
+                count=len(metadatas)
+            )
+
+        return boosts
     
     def get_related_content(self, document_id: str, max_results: int = 3) -> list[RetrievalResult]:
         """Get content related to a specific document."""
@@ -267,19 +561,20 @@ class CampaignRetriever:
         
         # Use the first chunk as query for finding related content
         first_chunk = chunks[0]['content'][:500]  # Use first 500 chars
-        
+
+        # The index already stores this chunk's embedding — reuse it and
+        # skip the transformer; fall back to text encoding when absent
+        chunk_embedding = self.vector_store.get_chunk_embedding(document_id, chunk_index=0)
+
         # Search for related content, excluding the original document
-        results = self.vector_store.search(
+        # index-side so no extra rows need to be fetched and discarded
+        related_results = self.vector_store.search(
             query=first_chunk,
-            n_results=max_results + 5  # Get extra in case we need to filter
+            n_results=max_results,
+            query_embedding=chunk_embedding,
+            exclude_document_id=document_id
         )
         
-        # Filter out results from the same document
-        related_results = [
-            r for r in results 
-            if r['metadata']['document_id'] != document_id
-        ][:max_results]
-        
         # Convert to RetrievalResult objects
         retrieval_results = []
         for result in related_results:
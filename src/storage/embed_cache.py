@@ -0,0 +1,74 @@
+"""
+Persistent embedding cache keyed by (model name, content hash).
+Lets repeated ingests of identical text skip the transformer entirely,
+even across collection resets and process restarts.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# SQLite caps bound parameters per statement; stay well under it
+_SELECT_CHUNK = 500
+
+
+class EmbedCache:
+    """SQLite-backed store of embeddings, one row per (model, hash).
+
+    Vectors are persisted as float16 bytes — half the disk footprint for
+    a sub-1e-3 round-trip error that is negligible against retrieval
+    thresholds. The cache lives outside the vector store's directory so
+    reset_collection leaves it intact.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        if path is None:
+            path = Path.home() / '.cache' / 'campaign' / 'embeddings.sqlite'
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS emb (
+                model TEXT,
+                hash BLOB,
+                vec BLOB,
+                PRIMARY KEY (model, hash)
+            )
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> bytes:
+        """Content key for a chunk of text."""
+        return hashlib.sha256(text.encode()).digest()
+
+    def get_many(self, model: str, hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Fetch cached vectors for the given hashes in few queries."""
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(set(hashes))
+
+        for start in range(0, len(unique), _SELECT_CHUNK):
+            part = unique[start:start + _SELECT_CHUNK]
+            placeholders = ','.join('?' * len(part))
+            rows = self._db.execute(
+                f"SELECT hash, vec FROM emb WHERE model = ? AND hash IN ({placeholders})",
+                [model, *part]
+            ).fetchall()
+            for content_hash, blob in rows:
+                found[content_hash] = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[bytes, np.ndarray]]) -> None:
+        """Store newly computed vectors."""
+        self._db.executemany(
+            "INSERT OR REPLACE INTO emb VALUES (?, ?, ?)",
+            [
+                (model, content_hash, np.asarray(vector, dtype=np.float16).tobytes())
+                for content_hash, vector in items
+            ]
+        )
+        self._db.commit()
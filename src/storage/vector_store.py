@@ -3,16 +3,70 @@ Vector storage module using ChromaDB for semantic search capabilities.
 Handles document embedding storage and retrieval for campaign content.
 """
 
+import hashlib
 import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import cached_property
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 from datetime import datetime
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
 
 from ..ingestion.document_processor import Document
+from .embed_cache import EmbedCache
+
+# One SentenceTransformer per (name, cache_dir, backend) process-wide:
+# additional VectorStore handles share it instead of re-loading hundreds
+# of MB of weights
+_MODEL_CACHE: Dict[tuple, SentenceTransformer] = {}
+
+
+def _topk_cosine(matrix: np.ndarray, query: np.ndarray, k: int) -> tuple:
+    """Exact top-k inner products of a unit query against unit rows.
+
+    Full-scan kernel for small corpora: one matrix-vector product plus
+    an argsort, so recall is perfect and there is no graph walk. Returns
+    (row_indices, scores), best first.
+    """
+    scores = matrix @ query
+    order = np.argsort(-scores)
+    if k < order.shape[0]:
+        order = order[:k]
+    return order, scores[order]
+
+
+try:
+    # JIT the scan when numba is installed; the NumPy fallback above
+    # stays in place otherwise
+    from numba import njit
+
+    _topk_cosine = njit(fastmath=True, cache=True)(_topk_cosine)
+except ImportError:
+    pass
+
+
+# Up to this many stored chunks a brute-force scan beats the HNSW graph
+# walk; past it every query goes through the index
+_EXACT_SEARCH_MAX_ROWS = 1024
+
+
+def _quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 scalar quantization.
+
+    Returns (codes, scales) where vector ≈ codes * scale. Cuts per-vector
+    memory 4x and lets dot products run on int32 accumulators.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
 
 
 class VectorStore:
@@ -34,6 +88,8 @@ class VectorStore:
         self.storage_path = Path(storage_path or settings.storage.vector_db.path)
         self.embedding_model_name = embedding_model or settings.embeddings.model.name
         self.collection_name = collection_name or settings.storage.vector_db.collection_name
+        self.insert_batch_size = settings.storage.vector_db.insert_batch_size
+        self._hnsw_config = settings.storage.vector_db
         
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
@@ -46,14 +102,126 @@ class VectorStore:
             )
         )
         
-        # Initialize embedding model
-        self.embedding_model = SentenceTransformer(
-            self.embedding_model_name,
-            cache_folder=settings.embeddings.model.cache_dir
-        )
+        # The embedding model itself loads lazily via embedding_model:
+        # listing, stats and deletes never pay its cold start
+        self._model_cache_dir = settings.embeddings.model.cache_dir
+        self._model_backend = settings.embeddings.model.backend
         
         # Get or create collection
         self.collection = self._get_or_create_collection()
+
+        # Sidecar document catalog: one row per document so listing and
+        # stats read O(#documents) instead of scanning every chunk, plus
+        # a small key/value table for store-level state (fingerprint,
+        # distance space) that must never ride on collection metadata —
+        # collection.modify replaces metadata wholesale and chokes on
+        # the hnsw:* keys
+        self._docs_db = sqlite3.connect(
+            str(self.storage_path / 'docs.sqlite'),
+            check_same_thread=False
+        )
+        self._docs_db.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                document_id TEXT PRIMARY KEY,
+                title TEXT,
+                file_path TEXT,
+                file_type TEXT,
+                content_type TEXT,
+                created_at TEXT,
+                total_chunks INTEGER
+            )
+        """)
+        self._docs_db.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        self._docs_db.commit()
+
+        # Pre-existing collections keep whatever space they were built
+        # with (Chroma's default is l2), so score conversion has to be
+        # per-space rather than assuming the ip layout of new ones
+        self._distance_space = self._load_distance_space()
+
+        # Cross-run embedding cache: survives reset_collection, so
+        # deterministic fixtures and re-ingests skip the transformer
+        self._embed_disk_cache = EmbedCache()
+
+        # Bumped on every write so read-side caches can invalidate
+        self.version = 0
+
+        # Optional int8 scalar-quantized side index (embeddings.quantization);
+        # ids = None marks it disabled (deletes, or rows this handle
+        # never embedded)
+        self.quantization = settings.embeddings.quantization
+        self._sq_ids: Optional[List[str]] = []
+        self._sq_codes: Optional[np.ndarray] = None
+        self._sq_scales: Optional[np.ndarray] = None
+
+        # Dense fp32 side matrix backing exact small-corpus search;
+        # ids = None marks it disabled (corpus too large or partial)
+        self._dense_ids: Optional[List[str]] = []
+        self._dense_vecs: Optional[np.ndarray] = None
+
+        # Dynamic result cache for repeated raw searches (version-keyed)
+        self._search_cache: OrderedDict = OrderedDict()
+        self._search_cache_size = 256
+
+        # Query-embedding memo: repeated query strings skip the
+        # transformer forward pass entirely
+        self._embed_cache: OrderedDict = OrderedDict()
+        self._embed_cache_size = 1024
+
+        # Both LRU caches are hit from worker threads when searches run
+        # concurrently (asyncio.to_thread); one lock serializes them
+        self._cache_lock = threading.Lock()
+
+        # Static warm: fault the persisted index into memory up front so
+        # the first real query doesn't pay the cold I/O
+        self._warm_index()
+
+    @cached_property
+    def embedding_model(self) -> SentenceTransformer:
+        """Lazily loaded embedding model, shared across instances."""
+        key = (self.embedding_model_name, self._model_cache_dir, self._model_backend)
+        model = _MODEL_CACHE.get(key)
+        if model is None:
+            # torch defaults to a conservative intra-op thread count on
+            # some builds; use every core for CPU encoding
+            import torch
+            torch.set_num_threads(os.cpu_count() or 1)
+
+            model = SentenceTransformer(
+                self.embedding_model_name,
+                cache_folder=self._model_cache_dir
+            )
+
+            # Optional reduced-precision inference: halves weight bytes
+            # and roughly doubles encode throughput at <1pt recall cost
+            if self._model_backend == 'fp16':
+                model = model.half()
+            elif self._model_backend == 'bf16':
+                # bfloat16 keeps fp32's exponent range, so activations
+                # survive without autocast; worthwhile only where the
+                # hardware runs bf16 natively (AVX-512 BF16, ARM BF16,
+                # Ampere+), hence opt-in rather than autodetected
+                model = model.to(dtype=torch.bfloat16)
+            elif self._model_backend == 'int8':
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+            _MODEL_CACHE[key] = model
+        return model
+
+    def _warm_index(self) -> None:
+        """Touch the collection once so index pages are resident."""
+        try:
+            if self.collection.count():
+                self.collection.peek(limit=1)
+        except Exception:
+            pass  # Warming is best-effort only
     
     def _get_or_create_collection(self):
         """Get existing collection or create a new one."""
@@ -62,22 +230,60 @@ class VectorStore:
         except ValueError:
             return self.client.create_collection(
                 name=self.collection_name,
-                metadata={"description": "Campaign documents and content"}
+                metadata={
+                    "description": "Campaign documents and content",
+                    # Every vector is L2-normalized at encode time, so
+                    # inner product ranks identically to cosine but
+                    # skips the per-pair norm work; distance stays
+                    # 1 - dot, i.e. similarity is exactly 1 - distance
+                    "hnsw:space": "ip",
+                    # Explicit graph parameters so the recall/QPS
+                    # tradeoff is tunable instead of implicit defaults
+                    "hnsw:M": self._hnsw_config.hnsw_m,
+                    "hnsw:construction_ef": self._hnsw_config.hnsw_construction_ef,
+                    "hnsw:search_ef": self._hnsw_config.hnsw_search_ef
+                }
             )
-    
-    def add_document(self, document: Document) -> None:
-        """Add a single document to the vector store."""
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        """Read one store-level key from the sidecar meta table."""
+        row = self._docs_db.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        """Write one store-level key to the sidecar meta table."""
+        self._docs_db.execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value)
+        )
+        self._docs_db.commit()
+
+    def _load_distance_space(self) -> str:
+        """Resolve the collection's distance space, persisting it.
+
+        Collection metadata is authoritative when present; the sidecar
+        copy covers collections whose metadata was clobbered by older
+        code that wrote through collection.modify.
+        """
+        space = (self.collection.metadata or {}).get('hnsw:space')
+        if space is not None:
+            self._set_meta('hnsw_space', space)
+            return space
+        return self._get_meta('hnsw_space') or 'l2'
+
+    def _prepare_chunks(self, document: Document) -> tuple[list[str], list[str], list[Dict[str, Any]]]:
+        """Build the (ids, texts, metadatas) triple for a document's chunks."""
         if not document.chunks:
             # If no chunks, treat entire content as one chunk
             chunks = [document.content]
         else:
             chunks = document.chunks
-        
-        # Prepare data for insertion
+
         ids = []
         documents = []
         metadatas = []
-        
+
         for i, chunk in enumerate(chunks):
             chunk_id = f"{document.id}_chunk_{i}"
             ids.append(chunk_id)
@@ -90,65 +296,471 @@ class VectorStore:
                 'file_path': document.file_path,
                 'file_type': document.file_type,
                 'chunk_index': i,
+                # Content hash keys embedding reuse across re-ingests
+                'chunk_hash': hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest(),
+                # Lets searches pre-filter to one chunk per document
+                # index-side instead of deduplicating after retrieval
+                'is_doc_head': i == 0,
                 'total_chunks': len(chunks),
                 'created_at': document.created_at.isoformat()
             }
             
-            # Serialize document metadata, converting datetime objects to strings
+            # Serialize document metadata down to JSON primitives so
+            # Chroma's per-chunk encoder never sees nested objects
             for key, value in document.metadata.items():
-                if isinstance(value, datetime):
+                if isinstance(value, (str, int, float, bool)):
+                    chunk_metadata[key] = value
+                elif isinstance(value, datetime):
                     chunk_metadata[key] = value.isoformat()
                 else:
-                    chunk_metadata[key] = value
+                    chunk_metadata[key] = str(value)
             metadatas.append(chunk_metadata)
-        
-        # Add to collection
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas
-        )
-    
+
+        return ids, documents, metadatas
+
+    def add_document(self, document: Document) -> None:
+        """Add a single document to the vector store."""
+        self.add_documents([document])
+
     def add_documents(self, documents: List[Document]) -> None:
-        """Add multiple documents to the vector store."""
+        """Add multiple documents to the vector store in one batched insert."""
+        all_ids = []
+        all_texts = []
+        all_metadatas = []
+
         for document in documents:
-            self.add_document(document)
+            ids, texts, metadatas = self._prepare_chunks(document)
+            all_ids.extend(ids)
+            all_texts.extend(texts)
+            all_metadatas.extend(metadatas)
+
+        if not all_ids:
+            return
+
+        # Content-hash document ids collide when two files hold
+        # identical content (a copied notes file), which would put
+        # duplicate chunk ids in one insert and abort the whole batch;
+        # keep the first occurrence of each id
+        if len(set(all_ids)) != len(all_ids):
+            seen_ids = set()
+            keep = []
+            for i, chunk_id in enumerate(all_ids):
+                if chunk_id not in seen_ids:
+                    seen_ids.add(chunk_id)
+                    keep.append(i)
+            all_ids = [all_ids[i] for i in keep]
+            all_texts = [all_texts[i] for i in keep]
+            all_metadatas = [all_metadatas[i] for i in keep]
+
+        # Reuse stored embeddings for unchanged chunks: on incremental
+        # re-ingest only the novel text pays the transformer cost
+        hashes = [metadata['chunk_hash'] for metadata in all_metadatas]
+        known = self._lookup_stored_embeddings(hashes)
+
+        # First occurrence of each unseen hash; later duplicates within
+        # the batch reuse its vector too
+        to_encode: Dict[str, int] = {}
+        for i, chunk_hash in enumerate(hashes):
+            if chunk_hash not in known and chunk_hash not in to_encode:
+                to_encode[chunk_hash] = i
+
+        if to_encode:
+            # Check the persistent cache next: identical text embedded
+            # in any earlier run — even against a since-reset
+            # collection — comes back from disk instead of the model
+            disk_keys = {
+                chunk_hash: EmbedCache.text_hash(all_texts[i])
+                for chunk_hash, i in to_encode.items()
+            }
+            cached = self._embed_disk_cache.get_many(
+                self.embedding_model_name, list(disk_keys.values())
+            )
+            for chunk_hash, key in disk_keys.items():
+                vector = cached.get(key)
+                if vector is not None:
+                    known[chunk_hash] = vector
+
+            novel = {
+                chunk_hash: i for chunk_hash, i in to_encode.items()
+                if chunk_hash not in known
+            }
+            if novel:
+                # One batched forward pass over the truly novel chunks,
+                # sorted by length first so each encode batch pads to
+                # similar sequence lengths instead of the batch maximum
+                novel_texts = [all_texts[i] for i in novel.values()]
+                order = np.argsort([len(text) for text in novel_texts])
+                encoded_sorted = self.embedding_model.encode(
+                    [novel_texts[i] for i in order],
+                    batch_size=64,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+                encoded = np.empty_like(encoded_sorted)
+                encoded[order] = encoded_sorted
+                for chunk_hash, vector in zip(novel, encoded):
+                    known[chunk_hash] = vector
+                self._embed_disk_cache.put_many(
+                    self.embedding_model_name,
+                    [(disk_keys[chunk_hash], known[chunk_hash]) for chunk_hash in novel]
+                )
+
+        embeddings = np.stack([
+            np.asarray(known[chunk_hash], dtype=np.float32) for chunk_hash in hashes
+        ])
+
+        step = self.insert_batch_size
+        for start in range(0, len(all_ids), step):
+            end = start + step
+            # Upsert, not add: re-ingesting unchanged files overwrites
+            # their rows instead of failing the batch on existing ids
+            self.collection.upsert(
+                ids=all_ids[start:end],
+                documents=all_texts[start:end],
+                metadatas=all_metadatas[start:end],
+                embeddings=embeddings[start:end].tolist()
+            )
+
+        if self.quantization == 'int8':
+            self._append_quantized(all_ids, embeddings)
+
+        self._append_dense(all_ids, embeddings)
+
+        self._docs_db.executemany(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    document.id,
+                    document.title,
+                    document.file_path,
+                    document.file_type,
+                    document.metadata.get('content_type', 'general'),
+                    document.created_at.isoformat(),
+                    len(document.chunks) if document.chunks else 1
+                )
+                for document in documents
+            ]
+        )
+        self._docs_db.commit()
+
+        self.version += 1
+
+    def _lookup_stored_embeddings(self, hashes: List[str]) -> Dict[str, Any]:
+        """Map chunk hashes to embeddings already stored in the collection."""
+        try:
+            existing = self.collection.get(
+                where={'chunk_hash': {'$in': list(set(hashes))}},
+                include=['embeddings', 'metadatas']
+            )
+        except Exception:
+            # Legacy collections without chunk_hash metadata
+            return {}
+
+        if existing.get('embeddings') is None or not existing['metadatas']:
+            return {}
+
+        return {
+            metadata['chunk_hash']: embedding
+            for metadata, embedding in zip(existing['metadatas'], existing['embeddings'])
+        }
+
+    def _append_quantized(self, ids: List[str], embeddings: np.ndarray) -> None:
+        """Add vectors to the int8 side index."""
+        if self._sq_ids is None:
+            return
+        codes, scales = _quantize_int8(embeddings)
+        self._sq_ids.extend(ids)
+        if self._sq_codes is None:
+            self._sq_codes = codes
+            self._sq_scales = scales
+        else:
+            self._sq_codes = np.vstack([self._sq_codes, codes])
+            self._sq_scales = np.concatenate([self._sq_scales, scales])
+        if len(self._sq_ids) != self.collection.count():
+            # The collection holds rows this handle never embedded
+            # (pre-existing data), so the index can't answer queries
+            self._sq_ids = None
+            self._sq_codes = None
+            self._sq_scales = None
+
+    def _append_dense(self, ids: List[str], embeddings: np.ndarray) -> None:
+        """Grow the dense side matrix backing exact small-corpus search."""
+        if self._dense_ids is None:
+            return
+        self._dense_ids.extend(ids)
+        if self._dense_vecs is None:
+            self._dense_vecs = embeddings.copy()
+        else:
+            self._dense_vecs = np.vstack([self._dense_vecs, embeddings])
+        if (len(self._dense_ids) > _EXACT_SEARCH_MAX_ROWS
+                or len(self._dense_ids) != self.collection.count()):
+            # Past the brute-force break-even point, or the collection
+            # holds rows this handle never embedded (pre-existing data):
+            # either way the scan can't answer queries, so disable it
+            self._dense_ids = None
+            self._dense_vecs = None
+
+    def _fetch_scored_payload(self, ids: List[str], scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Materialize formatted results for pre-scored chunk ids."""
+        payload = self.collection.get(ids=ids, include=['documents', 'metadatas'])
+        by_id = {
+            chunk_id: (document, metadata)
+            for chunk_id, document, metadata
+            in zip(payload['ids'], payload['documents'], payload['metadatas'])
+        }
+        return [
+            {
+                'content': by_id[chunk_id][0],
+                'metadata': by_id[chunk_id][1],
+                'distance': float(1.0 - score),
+                'similarity': float(min(max(score, 0.0), 1.0))
+            }
+            for chunk_id, score in zip(ids, scores)
+        ]
+
+    def _exact_search(self,
+                      embeddings: np.ndarray,
+                      n_results: int) -> Optional[List[List[Dict[str, Any]]]]:
+        """Brute-force top-k over the dense side matrix, if it covers
+        the collection. Returns None when it doesn't, and callers fall
+        back to the HNSW index."""
+        if self._dense_ids is None or self._dense_vecs is None:
+            return None
+
+        batches = []
+        for query_vec in np.asarray(embeddings, dtype=np.float32):
+            order, scores = _topk_cosine(self._dense_vecs, query_vec, n_results)
+            ids = [self._dense_ids[i] for i in order]
+            batches.append(self._fetch_scored_payload(ids, scores))
+        return batches
+
+    def _quantized_search(self,
+                          embeddings: np.ndarray,
+                          n_results: int) -> Optional[List[List[Dict[str, Any]]]]:
+        """Answer unfiltered searches from the int8 side index, if it
+        covers the collection. Returns None when quantization is off or
+        the index is partial, falling back to the other paths."""
+        if self.quantization != 'int8':
+            return None
+
+        batches = []
+        for query_vec in np.asarray(embeddings, dtype=np.float32):
+            scored = self.quantized_similarities(query_vec, top_k=n_results)
+            if scored is None:
+                return None
+            ids, scores = scored
+            batches.append(self._fetch_scored_payload(ids, scores))
+        return batches
+
+    def quantized_similarities(self,
+                               query_embedding: np.ndarray,
+                               top_k: Optional[int] = None) -> Optional[tuple[List[str], np.ndarray]]:
+        """Score every stored vector against a query via int8 dot products.
+
+        Returns (chunk_ids, similarities) or None when quantization is off
+        or the side index is empty. With top_k set, only the k best rows
+        come back, selected via an O(N) argpartition rather than a full
+        sort, ordered best first.
+        """
+        if not self._sq_ids or self._sq_codes is None:
+            return None
+
+        q_codes, q_scales = _quantize_int8(query_embedding[None, :])
+        # int32 accumulation over int8 operands, rescaled back to float
+        raw = self._sq_codes.astype(np.int32) @ q_codes[0].astype(np.int32)
+        scores = raw.astype(np.float32) * self._sq_scales * q_scales[0]
+
+        if top_k is None or top_k >= len(scores):
+            return self._sq_ids, scores
+
+        top = np.argpartition(-scores, top_k)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [self._sq_ids[i] for i in top], scores[top]
+
+    def embed_query(self, query: str):
+        """Embed a single query string, memoizing repeated strings."""
+        return self._embed_queries([query])[0]
+
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, batch-encoding only the cache misses."""
+        with self._cache_lock:
+            embeddings = [self._embed_cache.get(query) for query in queries]
+            for query, embedding in zip(queries, embeddings):
+                if embedding is not None:
+                    self._embed_cache.move_to_end(query)
+
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if misses:
+            # Encode outside the lock; only the cache writes are guarded
+            encoded = self.embedding_model.encode(
+                [queries[i] for i in misses],
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            with self._cache_lock:
+                for i, vector in zip(misses, encoded):
+                    embeddings[i] = vector
+                    self._embed_cache[queries[i]] = vector
+                    if len(self._embed_cache) > self._embed_cache_size:
+                        self._embed_cache.popitem(last=False)
+
+        return np.stack(embeddings)
     
-    def search(self, 
-               query: str, 
+    def search(self,
+               query: str,
                n_results: int = 10,
                content_type: Optional[str] = None,
-               file_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Search for relevant documents using semantic similarity."""
-        # Build where clause for filtering
-        where_clause = {}
+               file_type: Optional[str] = None,
+               query_embedding: Optional[np.ndarray] = None,
+               doc_head_only: bool = False,
+               exclude_document_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for relevant documents using semantic similarity.
+
+        Callers that already hold the query's embedding (the retriever
+        embeds once for its semantic cache) can pass it to skip the
+        encode step here. doc_head_only restricts matching to each
+        document's first chunk index-side, for one-per-document results.
+        """
+        # Dynamic cache: exact repeats of a raw search skip the index
+        cache_key = (query, n_results, content_type, file_type,
+                     doc_head_only, exclude_document_id, self.version)
+        with self._cache_lock:
+            cached = self._search_cache.get(cache_key)
+            if cached is not None:
+                self._search_cache.move_to_end(cache_key)
+        if cached is not None:
+            # Hand out copies: the retriever rewrites 'similarity'
+            # in place during post-processing, and a shared reference
+            # would re-boost already-boosted cached scores
+            return [dict(result) for result in cached]
+
+        # Single-query searches share the batched pipeline so there is
+        # one where-clause builder and one embed-and-query code path
+        formatted_results = self.search_batch(
+            [query],
+            n_results=n_results,
+            content_type=content_type,
+            file_type=file_type,
+            query_embeddings=None if query_embedding is None else query_embedding[None, :],
+            doc_head_only=doc_head_only,
+            exclude_document_id=exclude_document_id
+        )[0]
+
+        with self._cache_lock:
+            # Cache a pristine copy; the list returned below is the
+            # caller's to mutate
+            self._search_cache[cache_key] = [dict(result) for result in formatted_results]
+            if len(self._search_cache) > self._search_cache_size:
+                self._search_cache.popitem(last=False)
+
+        return formatted_results
+
+    def _format_query_results(self, results: Dict[str, Any], query_index: int) -> List[Dict[str, Any]]:
+        """Format one query's slice of a (possibly batched) query response."""
+        if not (results['documents'] and len(results['documents']) > query_index
+                and results['documents'][query_index]):
+            return []
+
+        documents = results['documents'][query_index]
+        metadatas = results['metadatas'][query_index]
+        distances = results['distances'][query_index]
+
+        distances_arr = np.asarray(distances, dtype=np.float32)
+        if self._distance_space == 'l2':
+            # Legacy collections: Chroma's l2 distance is squared L2,
+            # which over unit vectors is 2 - 2*cos, so cos = 1 - d/2
+            similarities = np.clip(1.0 - distances_arr / 2.0, 0.0, 1.0)
+        else:
+            # ip/cosine space over unit vectors: similarity is exactly
+            # 1 - distance, clipped in one vectorized pass
+            similarities = np.clip(1.0 - distances_arr, 0.0, 1.0)
+
+        return [
+            {
+                'content': document,
+                'metadata': metadata,
+                'distance': distance,
+                'similarity': float(similarity)
+            }
+            for document, metadata, distance, similarity
+            in zip(documents, metadatas, distances, similarities)
+        ]
+
+    def search_batch(self,
+                     queries: List[str],
+                     n_results: int = 10,
+                     content_type: Optional[str] = None,
+                     file_type: Optional[str] = None,
+                     query_embeddings: Optional[np.ndarray] = None,
+                     doc_head_only: bool = False,
+                     exclude_document_id: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Search several queries in one embed pass and one index call."""
+        if not queries:
+            return []
+
+        # Chroma validates exactly one top-level key per where dict, so
+        # multiple conditions must combine under an explicit $and
+        conditions = []
         if content_type:
-            where_clause['content_type'] = content_type
+            conditions.append({'content_type': content_type})
         if file_type:
-            where_clause['file_type'] = file_type
-        
-        # Perform search
+            conditions.append({'file_type': file_type})
+        if doc_head_only:
+            conditions.append({'is_doc_head': True})
+        if exclude_document_id:
+            # Filter self-matches index-side instead of post-filtering
+            conditions.append({'document_id': {'$ne': exclude_document_id}})
+
+        if not conditions:
+            where_clause = None
+        elif len(conditions) == 1:
+            where_clause = conditions[0]
+        else:
+            where_clause = {'$and': conditions}
+
+        # One batched forward pass over the cache misses only, instead
+        # of N model calls
+        if query_embeddings is None:
+            embeddings = self._embed_queries(queries)
+        else:
+            embeddings = np.asarray(query_embeddings)
+
+        # Unfiltered queries bypass the graph walk where a side index
+        # covers the collection: the int8 scan when quantization is on,
+        # else the exact fp32 scan for small corpora
+        if where_clause is None:
+            scanned = (self._quantized_search(embeddings, n_results)
+                       or self._exact_search(embeddings, n_results))
+            if scanned is not None:
+                return scanned
+
         results = self.collection.query(
-            query_texts=[query],
+            query_embeddings=embeddings.tolist(),
             n_results=n_results,
-            where=where_clause if where_clause else None,
+            where=where_clause,
             include=['documents', 'metadatas', 'distances']
         )
-        
-        # Format results
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            for i in range(len(results['documents'][0])):
-                result = {
-                    'content': results['documents'][0][i],
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i],
-                    'similarity': max(0.0, 1 - results['distances'][0][i] / 2.0)  # Normalize distance to [0,1] similarity
-                }
-                formatted_results.append(result)
-        
-        return formatted_results
+
+        return [self._format_query_results(results, qi) for qi in range(len(queries))]
     
+    def get_chunk_embedding(self, document_id: str, chunk_index: int = 0) -> Optional[np.ndarray]:
+        """Fetch a chunk's stored embedding instead of re-encoding its text."""
+        # Chroma's where-validation allows exactly one top-level key, so
+        # the two-field filter has to go through an explicit $and
+        results = self.collection.get(
+            where={'$and': [
+                {'document_id': document_id},
+                {'chunk_index': chunk_index}
+            ]},
+            include=['embeddings']
+        )
+
+        embeddings = results.get('embeddings')
+        if embeddings is None or not len(embeddings):
+            return None
+        return np.asarray(embeddings[0], dtype=np.float32)
+
     def get_document_chunks(self, document_id: str) -> List[Dict[str, Any]]:
         """Retrieve all chunks for a specific document."""
         results = self.collection.get(
@@ -156,35 +768,63 @@ class VectorStore:
             include=['documents', 'metadatas']
         )
         
-        chunks = []
-        if results['documents']:
-            for i in range(len(results['documents'])):
-                chunk = {
-                    'content': results['documents'][i],
-                    'metadata': results['metadatas'][i]
-                }
-                chunks.append(chunk)
-        
-        # Sort by chunk index
-        chunks.sort(key=lambda x: x['metadata'].get('chunk_index', 0))
-        return chunks
+        if not results['documents']:
+            return []
+
+        chunks = [
+            {'content': content, 'metadata': metadata}
+            for content, metadata in zip(results['documents'], results['metadatas'])
+        ]
+
+        # Sort by chunk index via an integer argsort rather than a
+        # Python-level key callable per comparison
+        order = np.argsort(np.fromiter(
+            (chunk['metadata'].get('chunk_index', 0) for chunk in chunks),
+            dtype=np.int64,
+            count=len(chunks)
+        ))
+        return [chunks[i] for i in order]
     
     def delete_document(self, document_id: str) -> None:
         """Delete all chunks of a document from the vector store."""
-        # Get all chunk IDs for this document
-        results = self.collection.get(
-            where={'document_id': document_id},
-            include=['ids']
+        # One server-side deletion pass; no round-trip materializing
+        # every chunk ID in Python first
+        self.collection.delete(where={'document_id': document_id})
+        self._docs_db.execute(
+            "DELETE FROM documents WHERE document_id = ?", (document_id,)
         )
-        
-        if results['ids']:
-            self.collection.delete(ids=results['ids'])
+        # The recorded full-ingest fingerprint no longer describes the
+        # collection's content
+        self._docs_db.execute("DELETE FROM meta WHERE key = 'content_fp'")
+        self._docs_db.commit()
+        # The side indexes no longer mirror the collection
+        self._dense_ids = None
+        self._dense_vecs = None
+        self._sq_ids = None
+        self._sq_codes = None
+        self._sq_scales = None
+        self.version += 1
     
     def list_documents(self) -> List[Dict[str, Any]]:
         """List all unique documents in the vector store."""
-        # Get all metadata
+        rows = self._docs_db.execute(
+            "SELECT document_id, title, file_path, file_type,"
+            " content_type, created_at, total_chunks FROM documents"
+        ).fetchall()
+
+        if not rows and self.collection.count():
+            # Collection predates the catalog — rebuild it from one full
+            # metadata scan so later listings stay index-sized reads
+            return self._backfill_document_catalog()
+
+        keys = ('document_id', 'title', 'file_path', 'file_type',
+                'content_type', 'created_at', 'total_chunks')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _backfill_document_catalog(self) -> List[Dict[str, Any]]:
+        """Rebuild the sidecar catalog from chunk metadata (legacy stores)."""
         results = self.collection.get(include=['metadatas'])
-        
+
         # Group by document_id and get unique documents
         documents = {}
         for metadata in results['metadatas']:
@@ -199,7 +839,13 @@ class VectorStore:
                     'created_at': metadata['created_at'],
                     'total_chunks': metadata['total_chunks']
                 }
-        
+
+        self._docs_db.executemany(
+            "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [tuple(doc.values()) for doc in documents.values()]
+        )
+        self._docs_db.commit()
+
         return list(documents.values())
     
     def get_collection_stats(self) -> Dict[str, Any]:
@@ -225,7 +871,50 @@ class VectorStore:
             'file_types': file_types
         }
     
+    @staticmethod
+    def compute_content_fingerprint(documents: List[Document]) -> str:
+        """Order-independent hash of every chunk across the documents.
+
+        Matching fingerprints mean a collection already holds exactly
+        this content, so callers can skip reset + re-ingest entirely.
+        """
+        chunk_hashes = sorted(
+            hashlib.sha256(chunk.encode()).hexdigest()
+            for document in documents
+            for chunk in (document.chunks or [document.content])
+        )
+        return hashlib.sha256(''.join(chunk_hashes).encode()).hexdigest()
+
+    def get_content_fingerprint(self) -> Optional[str]:
+        """Fingerprint recorded by the last full ingest, if any."""
+        fingerprint = self._get_meta('content_fp')
+        if fingerprint is not None:
+            return fingerprint
+        # Fingerprints from before the sidecar lived on collection
+        # metadata; honor them once so old stores still skip re-ingest
+        return (self.collection.metadata or {}).get('content_fp')
+
+    def set_content_fingerprint(self, fingerprint: str) -> None:
+        """Record the fingerprint of the collection's current content.
+
+        Stored in the sidecar rather than collection metadata:
+        collection.modify replaces metadata wholesale, so writing
+        through it would strip the hnsw:* keys the collection was
+        created with.
+        """
+        self._set_meta('content_fp', fingerprint)
+
     def reset_collection(self) -> None:
         """Delete all data in the collection."""
         self.client.delete_collection(name=self.collection_name)
-        self.collection = self._get_or_create_collection()
\ No newline at end of file
+        self.collection = self._get_or_create_collection()
+        self._docs_db.execute("DELETE FROM documents")
+        self._docs_db.execute("DELETE FROM meta WHERE key = 'content_fp'")
+        self._docs_db.commit()
+        self._distance_space = self._load_distance_space()
+        self._sq_ids = []
+        self._sq_codes = None
+        self._sq_scales = None
+        self._dense_ids = []
+        self._dense_vecs = None
+        self.version += 1
\ No newline at end of file
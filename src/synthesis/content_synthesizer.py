@@ -1,8 +1,46 @@
+import asyncio
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
+
+import numpy as np
+
 from ..llm.base import BaseLLMService, LLMResponse
 from ..retrieval.retriever import CampaignRetriever
 
+# Per-document character budget for LLM context: bounds prompt size (the
+# dominant latency/cost lever) regardless of chunk length
+_CONTEXT_DOC_CHAR_BUDGET = 1200
+
+# System-prompt building blocks; the full (intent, tone) product is
+# precomputed per synthesizer so prompt building is one dict lookup
+_BASE_PROMPTS = {
+    "general": "You are a helpful D&D Campaign Assistant. Provide clear, accurate information based on the provided context.",
+
+    "session_prep": """You are a D&D Campaign Assistant helping a DM prepare for a session.
+Focus on actionable information: plot hooks, NPC motivations, potential encounters, and narrative connections.
+Be specific and practical - provide concrete details the DM can use immediately.""",
+
+    "npc_info": """You are a D&D Campaign Assistant providing NPC information.
+Focus on personality, motivations, relationships, and potential dialogue.
+Make NPCs feel alive and memorable with distinct voices and mannerisms.""",
+
+    "lore_expansion": """You are a D&D Campaign Assistant expanding on campaign lore.
+Maintain consistency with established facts while adding rich detail.
+Focus on world-building elements: history, culture, politics, and interconnections.""",
+
+    "encounter_design": """You are a D&D Campaign Assistant helping design encounters.
+Consider party level, narrative context, and tactical variety.
+Provide both combat and non-combat encounter options where appropriate."""
+}
+
+_TONE_GUIDANCE = {
+    "dark": "Maintain a dark, serious tone with hints of danger and moral complexity.",
+    "whimsical": "Use a lighthearted, playful tone with humor and wonder.",
+    "epic": "Use a grand, heroic tone emphasizing high stakes and legendary deeds.",
+    "mysterious": "Maintain an air of mystery and intrigue, revealing information gradually.",
+    "gritty": "Use a realistic, harsh tone focusing on practical concerns and consequences."
+}
+
 
 @dataclass
 class SynthesisRequest:
@@ -30,22 +68,36 @@ class ContentSynthesizer:
     def __init__(self, retriever: CampaignRetriever, llm_service: BaseLLMService):
         self.retriever = retriever
         self.llm_service = llm_service
+
+        # Precompute every (intent, tone) system prompt once
+        self._prompt_cache = {
+            (intent, tone): base + (f"\n\nTone: {_TONE_GUIDANCE[tone]}" if tone else "")
+            for intent, base in _BASE_PROMPTS.items()
+            for tone in (None, *_TONE_GUIDANCE)
+        }
     
     async def synthesize(self, request: SynthesisRequest) -> SynthesisResult:
         """Synthesize content based on the request"""
         
-        # 1. Retrieve relevant documents
-        search_results = self.retriever.search(
+        # 1. Retrieve relevant documents off the event loop: the
+        # retriever is synchronous CPU work (embedding + ANN search) and
+        # would otherwise stall concurrent syntheses
+        search_results = await asyncio.to_thread(
+            self.retriever.search,
             query=request.query,
             max_results=request.max_context_docs
         )
         
-        # 2. Build context documents
-        context_docs = []
-        sources = []
-        for result in search_results:
-            context_docs.append(f"Source: {result.metadata.get('source', 'Unknown')}\n{result.content}")
-            sources.append(result.metadata.get('source', 'Unknown'))
+        # 2. Build context documents and sources in one pass, capping
+        # each document's contribution to the prompt
+        items = [
+            (result.metadata.get('source', 'Unknown'),
+             result.content[:_CONTEXT_DOC_CHAR_BUDGET])
+            for result in search_results
+        ]
+        context_docs = [f"Source: {source}\n{body}" for source, body in items]
+        # Deduplicate while preserving retrieval order
+        sources = list(dict.fromkeys(source for source, _ in items))
         
         # 3. Build system prompt based on intent and tone
         system_prompt = self._build_system_prompt(request.intent, request.tone)
@@ -59,9 +111,16 @@ class ContentSynthesizer:
             intent=request.intent
         )
         
-        # 5. Calculate confidence based on retrieval scores and LLM metadata
-        confidence = self._calculate_confidence(search_results, llm_response)
-        
+        # 5. Calculate confidence based on retrieval scores and LLM
+        # metadata; the score array is built once and shared with the
+        # metadata payload
+        scores = np.fromiter(
+            (r.relevance_score for r in search_results),
+            dtype=np.float32,
+            count=len(search_results)
+        )
+        confidence = self._calculate_confidence(scores, llm_response)
+
         return SynthesisResult(
             content=llm_response.content,
             sources=sources,
@@ -70,82 +129,57 @@ class ContentSynthesizer:
                 "intent": request.intent,
                 "tone": request.tone,
                 "num_context_docs": len(context_docs),
-                "retrieval_scores": [r.relevance_score for r in search_results]
+                "retrieval_scores": scores.tolist()
             },
             llm_response=llm_response
         )
     
+    async def synthesize_batch(self, requests: list[SynthesisRequest]) -> list["SynthesisResult"]:
+        """Synthesize several requests concurrently so LLM I/O overlaps"""
+        return await asyncio.gather(*[self.synthesize(request) for request in requests])
+
     def _build_system_prompt(self, intent: str, tone: Optional[str] = None) -> str:
         """Build system prompt based on intent and tone"""
-        
-        base_prompts = {
-            "general": "You are a helpful D&D Campaign Assistant. Provide clear, accurate information based on the provided context.",
-            
-            "session_prep": """You are a D&D Campaign Assistant helping a DM prepare for a session. 
-Focus on actionable information: plot hooks, NPC motivations, potential encounters, and narrative connections.
-Be specific and practical - provide concrete details the DM can use immediately.""",
-            
-            "npc_info": """You are a D&D Campaign Assistant providing NPC information.
-Focus on personality, motivations, relationships, and potential dialogue.
-Make NPCs feel alive and memorable with distinct voices and mannerisms.""",
-            
-            "lore_expansion": """You are a D&D Campaign Assistant expanding on campaign lore.
-Maintain consistency with established facts while adding rich detail.
-Focus on world-building elements: history, culture, politics, and interconnections.""",
-            
-            "encounter_design": """You are a D&D Campaign Assistant helping design encounters.
-Consider party level, narrative context, and tactical variety.
-Provide both combat and non-combat encounter options where appropriate."""
-        }
-        
-        system_prompt = base_prompts.get(intent, base_prompts["general"])
-        
-        # Add tone guidance
-        if tone:
-            tone_guidance = {
-                "dark": "Maintain a dark, serious tone with hints of danger and moral complexity.",
-                "whimsical": "Use a lighthearted, playful tone with humor and wonder.",
-                "epic": "Use a grand, heroic tone emphasizing high stakes and legendary deeds.",
-                "mysterious": "Maintain an air of mystery and intrigue, revealing information gradually.",
-                "gritty": "Use a realistic, harsh tone focusing on practical concerns and consequences."
-            }
-            
-            if tone in tone_guidance:
-                system_prompt += f"\n\nTone: {tone_guidance[tone]}"
-        
-        return system_prompt
+        prompt = self._prompt_cache.get((intent, tone))
+        if prompt is None:
+            # Unknown intents fall back to general; unknown tones are ignored
+            prompt = self._prompt_cache[(
+                intent if intent in _BASE_PROMPTS else "general",
+                tone if tone in _TONE_GUIDANCE else None
+            )]
+        return prompt
     
-    def _calculate_confidence(self, search_results: list[Any], llm_response: LLMResponse) -> float:
+    def _calculate_confidence(self, scores: np.ndarray, llm_response: LLMResponse) -> float:
         """Calculate confidence score for the synthesis"""
-        
-        if not search_results:
+
+        if not scores.size:
             return 0.1  # Very low confidence without context
-        
+
         # Base confidence on retrieval quality
-        avg_retrieval_score = sum(r.relevance_score for r in search_results) / len(search_results)
-        
+        avg_retrieval_score = float(scores.mean())
+
         # Adjust based on number of sources
-        source_bonus = min(0.2, len(search_results) * 0.05)
-        
+        source_bonus = min(0.2, scores.size * 0.05)
+
         # TODO: Add LLM confidence indicators when available
         # llm_confidence = self._extract_llm_confidence(llm_response)
-        
+
         confidence = min(1.0, avg_retrieval_score + source_bonus)
         return round(confidence, 2)
     
     async def generate_session_summary(
-        self, 
-        session_notes: str, 
+        self,
+        session_notes: "str | bytes",
         campaign_context: Optional[Dict[str, Any]] = None
     ) -> SynthesisResult:
         """Generate a session summary and update campaign state"""
-        
-        request = SynthesisRequest(
-            query=f"Please create a session summary and identify important story developments from these notes:\n\n{session_notes}",
-            intent="session_prep",
-            max_context_docs=3
-        )
-        
+
+        # Accept raw bytes (e.g. mmap-backed reads of large note files)
+        if isinstance(session_notes, (bytes, memoryview)):
+            session_notes = bytes(session_notes).decode('utf-8', errors='replace')
+
+        query = f"Please create a session summary and identify important story developments from these notes:\n\n{session_notes}"
+
         # Enhance system prompt for session summaries
         system_prompt = """You are a D&D Campaign Assistant creating a session summary.
 
@@ -171,25 +205,32 @@ Format your response as:
 
 Be concise but thorough. Focus on information that will be useful for future session preparation."""
         
-        # Retrieve relevant campaign context
-        context_results = self.retriever.search(
+        # Retrieve relevant campaign context without blocking the loop
+        context_results = await asyncio.to_thread(
+            self.retriever.search,
             query=f"campaign context session history {session_notes[:200]}",
             max_results=3
         )
-        
+
         context_docs = [f"Source: {r.metadata.get('source', 'Unknown')}\n{r.content}" for r in context_results]
-        
+
         llm_response = await self.llm_service.generate_with_context(
-            prompt=request.query,
+            prompt=query,
             context_documents=context_docs,
             system_prompt=system_prompt,
             intent="session_summary"
         )
         
+        context_scores = np.fromiter(
+            (r.relevance_score for r in context_results),
+            dtype=np.float32,
+            count=len(context_results)
+        )
+
         return SynthesisResult(
             content=llm_response.content,
             sources=[r.metadata.get('source', 'Unknown') for r in context_results],
-            confidence=self._calculate_confidence(context_results, llm_response),
+            confidence=self._calculate_confidence(context_scores, llm_response),
             metadata={"intent": "session_summary", "type": "campaign_update"},
             llm_response=llm_response
         )
\ No newline at end of file